@@ -0,0 +1,113 @@
+"""
+Deterministic frame fixtures for the benchmarks.
+
+Synthetic frames are generated from a fixed seed, so every run (and every
+machine) measures the same pixels. Recorded clips are read from
+benchmarks/clips/ (or any directory passed with --clips) and resized to
+each benchmark resolution.
+"""
+import glob
+import os
+import cv2
+import numpy as np
+from detectors.landmarks import NUM_LANDMARKS
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+CLIPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "clips")
+CLIP_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+
+def synthetic_frames(size, count=60, seed=0):
+    """
+    `count` BGR frames of a textured background with a face-like shape
+    drifting across it, so trackers see motion between frames.
+    """
+    w, h = size
+    rng = np.random.default_rng(seed)
+
+    # Static background: gradient plus fixed noise
+    gradient = np.linspace(40, 200, w, dtype=np.float32)[None, :, None]
+    background = np.repeat(np.repeat(gradient, h, axis=0), 3, axis=2)
+    background += rng.normal(0, 12, size=(h, w, 3)).astype(np.float32)
+    background = np.clip(background, 0, 255).astype(np.uint8)
+
+    face_w, face_h = int(w * 0.18), int(h * 0.32)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        cx = int(w / 2 + np.sin(i / 10) * w * 0.05)
+        cy = int(h / 2 + np.cos(i / 13) * h * 0.03)
+        cv2.ellipse(frame, (cx, cy), (face_w // 2, face_h // 2), 0, 0, 360, (150, 170, 200), -1)
+        for side in (-1, 1):
+            eye = (cx + side * face_w // 5, cy - face_h // 8)
+            cv2.ellipse(frame, eye, (face_w // 10, face_h // 24), 0, 0, 360, (40, 40, 40), -1)
+        cv2.ellipse(frame, (cx, cy + face_h // 5), (face_w // 6, face_h // 20), 0, 0, 360, (60, 60, 140), -1)
+        frames.append(frame)
+    return frames
+
+
+def find_clips(directory=CLIPS_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        path for path in glob.glob(os.path.join(directory, "*"))
+        if path.lower().endswith(CLIP_EXTENSIONS)
+    )
+
+
+def clip_frames(path, size, count=60):
+    """Up to `count` frames of a recorded clip, resized to `size`."""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if (frame.shape[1], frame.shape[0]) != size:
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def synthetic_landmarks(seed=0):
+    """
+    A (478, 3) normalized landmark array roughly shaped like a frontal face,
+    for benchmarking the landmark consumers without running the model.
+    """
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(0, 2 * np.pi, NUM_LANDMARKS)
+    radii = np.sqrt(rng.uniform(0, 1, NUM_LANDMARKS))
+    points = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    points[:, 0] = 0.5 + 0.12 * radii * np.cos(angles)
+    points[:, 1] = 0.5 + 0.18 * radii * np.sin(angles)
+    points[:, 2] = rng.normal(0, 0.02, NUM_LANDMARKS)
+
+    # Put the points the detectors index into plausible places
+    anchors = {
+        1: (0.5, 0.52),      # nose tip
+        10: (0.5, 0.33),     # forehead
+        152: (0.5, 0.68),    # chin
+        234: (0.38, 0.5),    # cheeks
+        454: (0.62, 0.5),
+        33: (0.42, 0.45),    # eye corners, lids and irises
+        133: (0.47, 0.45),
+        159: (0.445, 0.44),
+        145: (0.445, 0.46),
+        468: (0.445, 0.45),
+        362: (0.53, 0.45),
+        263: (0.58, 0.45),
+        386: (0.555, 0.44),
+        374: (0.555, 0.46),
+        473: (0.555, 0.45),
+        61: (0.46, 0.6),     # mouth corners
+        291: (0.54, 0.6),
+    }
+    for index, (x, y) in anchors.items():
+        points[index, :2] = (x, y)
+    return points
@@ -0,0 +1,296 @@
+"""
+Benchmark the detection stages and the full per-frame pipeline on fixed
+frame sets, without a camera.
+
+Cold start is measured first, in a fresh interpreter: the time to import
+main.py and the time to load the face landmarker.
+
+Each fixture (synthetic frames, plus any clips in benchmarks/clips/) is
+run at 480p, 720p and 1080p. Reported per stage: p50/p95/p99 latency,
+plus pipeline frames/sec and peak RSS. Results can be saved as a baseline
+and later runs compared against it; regressions beyond the tolerance make
+the command exit with status 1.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --tolerance 0.15
+    python -m benchmarks.run_benchmarks --resolutions 480p --frames 30 --clips recordings/
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import cv2
+import mediapipe as mp
+from benchmarks.fixtures import (
+    RESOLUTIONS,
+    CLIPS_DIR,
+    synthetic_frames,
+    find_clips,
+    clip_frames,
+    synthetic_landmarks,
+)
+from detectors.face_detector import detect_faces, FaceTracker
+from detectors.face_mesh_service import FaceMeshService
+from detectors.face_pipeline import detect_faces_and_landmarks
+from detectors.head_pose_detector import is_head_straight
+from detectors.eye_gaze_detector import is_gaze_suspicious
+from session.proctor_session import ProctorSession
+from utils.drawing import draw_text, draw_face_mesh, draw_violations
+from utils.stage_profiler import StageProfiler
+from utils.frame_packet import FramePacket
+from utils.frame_proxy import FrameProxy
+from config.settings import PROXY_MAX_WIDTH
+from violations.violation_manager import ViolationManager
+from violations.violation_types import ViolationType
+
+# Frames run before timing starts (model warm-up, caches, allocations)
+WARMUP_FRAMES = 5
+
+# Frame interval used for the simulated clock
+FRAME_INTERVAL = 1 / 30
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Run in a fresh interpreter, so nothing is imported or loaded yet
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter() - start
+from detectors.model_registry import models
+models.require("face_mesh")
+print(json.dumps({"import_s": imported, "face_mesh_load_s": models.load_times()["face_mesh"]}))
+"""
+
+
+def bench_startup():
+    """Cold-start costs in seconds: importing main and loading the landmarker."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    return {name: round(seconds, 3) for name, seconds in timings.items()}
+
+
+def _load_phone_detector():
+    try:
+        from detectors import phone_detector
+    except Exception as e:
+        print(f"Skipping phone stage: {e}")
+        return None
+    if phone_detector.get_model() is None:
+        print("Skipping phone stage: YOLO model not loaded")
+        return None
+    return phone_detector.detect_phone
+
+
+def bench_stages(frames, face_mesh, detect_phone=None):
+    """Time each stage on its own over every frame."""
+    profiler = StageProfiler(enabled=False)
+    landmarks = synthetic_landmarks()
+    tracker = FaceTracker()
+    manager = ViolationManager(clock=lambda: 0.0, verbose=False)
+
+    for i, frame in enumerate(frames):
+        profiler.enabled = i >= WARMUP_FRAMES
+
+        with profiler.stage("detect_faces"):
+            detect_faces(frame)
+        with profiler.stage("face_tracker"):
+            tracker.detect(frame)
+        with profiler.stage("convert"):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        with profiler.stage("face_mesh"):
+            face_mesh.detect(mp_image)
+        with profiler.stage("head_pose"):
+            is_head_straight(landmarks, frame.shape)
+        with profiler.stage("gaze"):
+            is_gaze_suspicious(landmarks)
+        canvas = frame.copy()
+        with profiler.stage("draw_face_mesh"):
+            draw_face_mesh(canvas, [landmarks])
+        with profiler.stage("violations"):
+            manager.register(ViolationType.HEAD_MOVEMENT)
+            manager.get_active_violations()
+        if detect_phone is not None:
+            with profiler.stage("phone"):
+                detect_phone(frame)
+
+    return profiler.summary()["stages"]
+
+
+def bench_pipeline(frames, face_mesh):
+    """Run frames through the same steps as the main loop, every detector every frame."""
+    profiler = StageProfiler(enabled=False)
+    tracker = FaceTracker()
+    packet = FramePacket(FrameProxy(PROXY_MAX_WIDTH))
+    t = 0.0
+    session = ProctorSession(clock=lambda: t, verbose=False)
+
+    start = None
+    for i, frame in enumerate(frames):
+        if i == WARMUP_FRAMES:
+            profiler.enabled = True
+            start = time.perf_counter()
+        t = i * FRAME_INTERVAL
+
+        with profiler.stage("pipeline"):
+            frame = frame.copy()
+            packet.load(frame, t)
+            faces, face_landmarks = detect_faces_and_landmarks(packet, face_mesh, t * 1000, tracker)
+            faces = packet.to_full_boxes(faces)
+
+            observation = session.observe(faces, face_landmarks, frame.shape, t)
+            session.update(observation, t)
+
+            draw_text(frame, f"Time Left: {int(session.time_left())}s", 40)
+            draw_text(frame, f"Violations: {session.violations.attempts}", 80)
+            draw_violations(frame, session.violations.get_active_violations())
+            if face_landmarks is not None:
+                draw_face_mesh(frame, [face_landmarks])
+        profiler.frame_done()
+
+    timed = len(frames) - WARMUP_FRAMES
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    summary = profiler.summary()["stages"].get("pipeline", {})
+    summary["fps"] = round(timed / elapsed, 2) if elapsed > 0 else 0.0
+    return summary
+
+
+def load_fixtures(resolutions, frame_count, clips_dir):
+    """Yield (name, frames) for every fixture at every resolution."""
+    clips = find_clips(clips_dir)
+    for res in resolutions:
+        size = RESOLUTIONS[res]
+        yield f"synthetic/{res}", synthetic_frames(size, frame_count)
+        for path in clips:
+            frames = clip_frames(path, size, frame_count)
+            if len(frames) <= WARMUP_FRAMES:
+                print(f"Skipping {path}: fewer than {WARMUP_FRAMES + 1} frames")
+                continue
+            yield f"{os.path.basename(path)}/{res}", frames
+
+
+def run(resolutions, frame_count, clips_dir, include_phone=False):
+    detect_phone = _load_phone_detector() if include_phone else None
+    results = {
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "opencv": cv2.__version__,
+        },
+        "startup": bench_startup(),
+        "fixtures": {},
+    }
+
+    for name, frames in load_fixtures(resolutions, frame_count, clips_dir):
+        print(f"Running {name} ({len(frames)} frames)")
+        # Fresh services per fixture: VIDEO mode keeps temporal state
+        image_mesh = FaceMeshService("IMAGE")
+        video_mesh = FaceMeshService("VIDEO")
+        stages = bench_stages(frames, image_mesh, detect_phone)
+        pipeline = bench_pipeline(frames, video_mesh)
+        image_mesh.close()
+        video_mesh.close()
+
+        results["fixtures"][name] = {
+            "stages": stages,
+            "pipeline": pipeline,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+    return results
+
+
+def print_results(results):
+    startup = results["startup"]
+    print(f"\nStartup: import {startup['import_s']:.3f} s, face mesh load {startup['face_mesh_load_s']:.3f} s")
+    for name, fixture in results["fixtures"].items():
+        pipeline = fixture["pipeline"]
+        print(f"\n{name}: {pipeline.get('fps', 0)} FPS, "
+              f"p50 {pipeline.get('p50_ms', 0):.2f} ms, peak RSS {fixture['peak_rss_mb']} MB")
+        for stage, s in fixture["stages"].items():
+            print(f"  {stage:<15} p50={s['p50_ms']:8.3f} ms  p95={s['p95_ms']:8.3f} ms  p99={s['p99_ms']:8.3f} ms")
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions (latency or FPS worse than baseline by > tolerance)."""
+    if baseline.get("host") != results["host"]:
+        print("WARNING: Baseline was recorded on a different host; comparisons may be noisy")
+
+    regressions = []
+    for name, seconds in results["startup"].items():
+        base_seconds = baseline.get("startup", {}).get(name)
+        if base_seconds and seconds > base_seconds * (1 + tolerance):
+            regressions.append(f"startup {name}: {base_seconds:.3f} -> {seconds:.3f} s")
+
+    for name, fixture in results["fixtures"].items():
+        base = baseline["fixtures"].get(name)
+        if base is None:
+            continue
+
+        for stage, s in fixture["stages"].items():
+            base_p50 = base["stages"].get(stage, {}).get("p50_ms")
+            if base_p50 and s["p50_ms"] > base_p50 * (1 + tolerance):
+                regressions.append(f"{name} {stage}: p50 {base_p50:.3f} -> {s['p50_ms']:.3f} ms")
+
+        base_fps = base["pipeline"].get("fps")
+        fps = fixture["pipeline"].get("fps")
+        if base_fps and fps < base_fps * (1 - tolerance):
+            regressions.append(f"{name} pipeline: {base_fps} -> {fps} FPS")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proctoring stages on fixed frame sets")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument("--frames", type=int, default=60, help="Frames per fixture")
+    parser.add_argument("--clips", default=CLIPS_DIR, help="Directory of recorded clips")
+    parser.add_argument("--phone", action="store_true", help="Include YOLO phone detection")
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--save-baseline", help="Write results as the new baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed slowdown before a result counts as a regression")
+    args = parser.parse_args()
+
+    if args.frames <= WARMUP_FRAMES:
+        parser.error(f"--frames must be greater than {WARMUP_FRAMES}")
+
+    cv2.setRNGSeed(0)
+    results = run(args.resolutions, args.frames, args.clips, args.phone)
+    print_results(results)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"\nResults written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for r in regressions:
+                print(f"  - {r}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,45 @@
+import time
 import cv2
 
 class CameraManager:
-    def __init__(self, camera_index=0):
+    # Frames arrive at capture rate rather than as fast as they are asked for
+    realtime = True
+    # Capturing on a background thread overlaps decoding with detection
+    needs_capture_thread = True
+
+    def __init__(self, camera_index=0, mirror=True):
         self.cap = cv2.VideoCapture(camera_index)
+        self.mirror = mirror
+        self.last_timestamp = None
+        self._raw = None  # Reused decode buffer for read_frame_into()
 
         if not self.cap.isOpened():
             raise RuntimeError("Camera could not be opened")
 
     def read_frame(self):
-        ret, frame = self.cap.read()
+        return self.read_frame_into(None)
+
+    def read_frame_into(self, dst):
+        """
+        Read (and mirror) the next frame into a preallocated buffer.
+        Returns the filled array (a new one if the capture size changed),
+        or None when the camera stops delivering frames.
+        """
+        if not self.mirror:
+            ret, frame = self.cap.read(dst)
+            self.last_timestamp = time.time()
+            return frame if ret else None
+
+        ret, self._raw = self.cap.read(self._raw)
+        self.last_timestamp = time.time()
         if not ret:
             return None
-        frame = cv2.flip(frame, 1) 
-        return frame
+        if dst is None or dst.shape != self._raw.shape:
+            return cv2.flip(self._raw, 1)
+        return cv2.flip(self._raw, 1, dst)
+
+    def seek(self, seconds):
+        raise ValueError("A live camera cannot seek")
 
     def release(self):
         self.cap.release()
@@ -1,10 +1,51 @@
+from camera.threaded_capture import ThreadedCapture, DROP_OLDEST
+
 class CameraStream:
-    def __init__(self, camera_manager):
+    def __init__(self, camera_manager, threaded=False, ring_size=4, policy=DROP_OLDEST):
+        """
+        Args:
+            camera_manager: Frame source (see camera/frame_source.py)
+            threaded: Capture on a background thread into a frame ring
+            ring_size: Number of preallocated frame buffers (threaded only)
+            policy: "drop_oldest" (newest frame wins) or "block" (every frame)
+        """
         self.camera = camera_manager
+        self.capture = None
+        self.last_timestamp = None
+        self._frame = None  # Reused buffer for unthreaded reads
+
+        if threaded:
+            self.capture = ThreadedCapture(camera_manager, ring_size, policy)
 
     def frames(self):
+        if self.capture is not None:
+            self.capture.start()
+
         while True:
-            frame = self.camera.read_frame()
-            if frame is None:
-                break
+            if self.capture is not None:
+                captured = self.capture.read()
+                if captured is None:
+                    break
+                self.last_timestamp = captured.timestamp
+                frame = captured.image
+            else:
+                # Mirror into the same buffer every frame; like a ring
+                # slot, it is only valid until the next frame is read
+                frame = self.camera.read_frame_into(self._frame)
+                if frame is None:
+                    break
+                self._frame = frame
+                self.last_timestamp = self.camera.last_timestamp
             yield frame
+
+    @property
+    def frames_captured(self):
+        return 0 if self.capture is None else self.capture.frames_captured
+
+    @property
+    def frames_dropped(self):
+        return 0 if self.capture is None else self.capture.frames_dropped
+
+    def stop(self):
+        if self.capture is not None:
+            self.capture.stop()
@@ -0,0 +1,187 @@
+"""
+Frame sources behind CameraStream.
+
+Every source exposes read_frame(), read_frame_into(dst), last_timestamp
+and release(), so CameraStream and ThreadedCapture work the same on:
+
+    CameraManager          a webcam (camera/camera_manager.py)
+    VideoFileSource        a recorded video
+    ImageDirectorySource   a directory of numbered images
+    SharedMemorySource     frames written by another process (camera/shared_memory_ring.py)
+
+Recorded sources play at `speed` times real time (1.0 = as recorded) or,
+with speed=None, as fast as they can be decoded. Their timestamps are the
+time the source was opened plus the media time since `start`, so a
+session started at the same time measures durations correctly at any
+speed and from any start position. `step` keeps every Nth frame (skipped
+video frames are grabbed but not decoded) and `start` / seek() jump to a
+position in seconds.
+"""
+import glob
+import os
+import time
+import cv2
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    """
+    Base class for recorded sources. Subclasses implement _read(dst),
+    returning (frame, media_seconds) or None at the end, and _seek(index).
+    """
+
+    # Frames arrive at capture rate rather than as fast as they are asked for
+    realtime = False
+    # Capturing on a background thread overlaps decoding with detection
+    needs_capture_thread = True
+
+    def __init__(self, fps, speed=None, mirror=False, step=1, start=0.0, epoch=None):
+        """
+        Args:
+            fps: Frame rate of the recording
+            speed: Playback speed (1.0 = real time), None = as fast as possible
+            mirror: Flip frames horizontally, like the webcam preview
+            step: Keep every Nth frame
+            start: Position to start from, in seconds
+            epoch: Wall-clock time of media time 0 (default: now minus
+                   `start`, so the first frame is stamped now)
+        """
+        if step < 1:
+            raise ValueError("step must be at least 1")
+        self.fps = fps
+        self.speed = speed
+        self.mirror = mirror
+        self.step = step
+        self.epoch = time.time() - start if epoch is None else epoch
+        self.realtime = speed is not None
+        self.index = 0          # Index of the next frame
+        self.last_timestamp = None
+        self._pace_anchor = None  # (wall time, media time) playback is paced from
+        if start:
+            self.seek(start)
+
+    def read_frame(self):
+        return self.read_frame_into(None)
+
+    def read_frame_into(self, dst):
+        """
+        Read the next kept frame, into `dst` where the source can decode in
+        place. Returns the frame, or None at the end of the recording.
+        """
+        result = self._read(dst)
+        if result is None:
+            return None
+        frame, media_time = result
+        if self.mirror:
+            frame = cv2.flip(frame, 1, frame)
+
+        self._pace(media_time)
+        self.last_timestamp = self.epoch + media_time
+        return frame
+
+    def seek(self, seconds):
+        """Continue from `seconds` into the recording (call before capture starts)."""
+        self.index = max(0, round(seconds * self.fps))
+        self._seek(self.index)
+        self._pace_anchor = None
+
+    def _pace(self, media_time):
+        if self.speed is None:
+            return
+        now = time.perf_counter()
+        if self._pace_anchor is None:
+            self._pace_anchor = (now, media_time)
+            return
+        wall_start, media_start = self._pace_anchor
+        delay = wall_start + (media_time - media_start) / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _read(self, dst):
+        raise NotImplementedError
+
+    def _seek(self, index):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, speed=1.0, mirror=False, step=1, start=0.0, epoch=None):
+        self.path = path
+        self._skip = 0  # Frames to pass over before the next read
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Video could not be opened: {path}")
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS) or 30.0, speed, mirror, step, start, epoch)
+
+    def _read(self, dst):
+        # grab() without retrieve() skips a frame without decoding it
+        for _ in range(self._skip):
+            if not self.cap.grab():
+                return None
+            self.index += 1
+        self._skip = self.step - 1
+
+        ret, frame = self.cap.read(dst)
+        if not ret:
+            return None
+        media_time = self.index / self.fps
+        self.index += 1
+        return frame, media_time
+
+    def _seek(self, index):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        self._skip = 0
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Images in a directory, in file name order, as frames at `fps`."""
+
+    def __init__(self, directory, fps=30.0, speed=1.0, mirror=False, step=1, start=0.0, epoch=None):
+        self.paths = sorted(
+            path for path in glob.glob(os.path.join(directory, "*"))
+            if path.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise RuntimeError(f"No images found in {directory}")
+        super().__init__(fps, speed, mirror, step, start, epoch)
+
+    def _read(self, dst):
+        while self.index < len(self.paths):
+            path = self.paths[self.index]
+            media_time = self.index / self.fps
+            self.index += self.step
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is not None:
+                return frame, media_time
+            print(f"WARNING: Skipping unreadable image {path}")
+        return None
+
+    def _seek(self, index):
+        pass
+
+
+def open_source(spec, speed=1.0, mirror=None, step=1, start=0.0, fps=30.0):
+    """
+    Open a frame source from a command-line style spec:
+        "0", "1", ...   camera index (mirrored by default)
+        "shm:NAME"      shared-memory ring written by another process
+        a directory     image sequence at `fps`
+        anything else   video file
+    """
+    spec = str(spec)
+    if spec.isdigit():
+        from camera.camera_manager import CameraManager
+        return CameraManager(int(spec), mirror=True if mirror is None else mirror)
+    if spec.startswith("shm:"):
+        from camera.shared_memory_ring import SharedMemorySource
+        return SharedMemorySource(spec[4:], mirror=bool(mirror))
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, fps, speed, bool(mirror), step, start)
+    return VideoFileSource(spec, speed, bool(mirror), step, start)
@@ -0,0 +1,209 @@
+"""
+Frame ring in multiprocessing.shared_memory, so a separate capture process
+can decode frames straight into memory the proctoring loop reads from.
+
+Layout of the block (all little-endian):
+    header     int64[8]        version, height, width, channels, slots,
+                               write_seq, closed, leased slot
+    slot_seq   int64[slots]    sequence number of the frame in each slot (-1 = being written)
+    slot_time  float64[slots]  capture time of each slot
+    frames     uint8[slots, height, width, channels]
+
+One writer, one reader. The writer fills slots round-robin and skips the
+slot the reader has leased; the reader always takes the newest frame.
+Nothing orders the two processes' memory accesses, so the lease alone
+can't rule out the writer reusing a slot mid-read: the reader copies the
+slot into its own reused buffer and then re-checks the slot's sequence
+number (a seqlock), discarding the frame if it changed.
+
+Writer (capture process):
+    writer = SharedMemoryFrameWriter("proctor-cam", (720, 1280, 3))
+    ok, _ = cap.read(writer.begin())   # decode straight into shared memory
+    writer.commit(time.time())
+    ...
+    writer.close()
+
+Reader:
+    python main.py --source shm:proctor-cam
+"""
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+import cv2
+import numpy as np
+
+VERSION = 1
+HEADER_FIELDS = 8
+VERSION_FIELD, HEIGHT, WIDTH, CHANNELS, SLOTS, WRITE_SEQ, CLOSED, LEASED = range(HEADER_FIELDS)
+
+
+def _views(buffer, slots, shape):
+    """numpy views of (header, slot_seq, slot_time, frames) over a block."""
+    header = np.ndarray((HEADER_FIELDS,), np.int64, buffer, 0)
+    offset = header.nbytes
+    slot_seq = np.ndarray((slots,), np.int64, buffer, offset)
+    offset += slot_seq.nbytes
+    slot_time = np.ndarray((slots,), np.float64, buffer, offset)
+    offset += slot_time.nbytes
+    frames = np.ndarray((slots,) + tuple(shape), np.uint8, buffer, offset)
+    return header, slot_seq, slot_time, frames
+
+
+def _block_size(slots, shape):
+    return 8 * (HEADER_FIELDS + 2 * slots) + slots * int(np.prod(shape))
+
+
+def _attach(name):
+    """
+    Open an existing block without taking ownership of it. Otherwise this
+    process's resource tracker would unlink the writer's block when the
+    reader exits (Python < 3.13 registers every attached block).
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedMemoryFrameWriter:
+    def __init__(self, name, shape, slots=4):
+        if slots < 3:
+            raise ValueError("A shared-memory ring needs at least 3 slots")
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=_block_size(slots, self.shape))
+        self.header, self.slot_seq, self.slot_time, self.frames = _views(self.shm.buf, slots, self.shape)
+
+        self.slot_seq[:] = -1
+        self.header[:] = (VERSION, *self.shape, slots, 0, 0, -1)
+        self._index = -1
+        self._seq = 0
+
+    def begin(self):
+        """Slot to fill with the next frame, as a writable array."""
+        index = (self._index + 1) % self.slots
+        if index == self.header[LEASED]:
+            index = (index + 1) % self.slots
+        self.slot_seq[index] = -1
+        # The reader may have leased this slot meanwhile; take the next one
+        if index == self.header[LEASED]:
+            index = (index + 1) % self.slots
+            self.slot_seq[index] = -1
+        self._index = index
+        return self.frames[index]
+
+    def commit(self, timestamp=None):
+        """Publish the slot filled since begin() as the newest frame."""
+        self.slot_time[self._index] = time.time() if timestamp is None else timestamp
+        self.slot_seq[self._index] = self._seq
+        self._seq += 1
+        self.header[WRITE_SEQ] = self._seq
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the ring."""
+        np.copyto(self.begin(), frame)
+        self.commit(timestamp)
+
+    def close(self):
+        """Tell the reader capture has ended and remove the block."""
+        self.header[CLOSED] = 1
+        del self.header, self.slot_seq, self.slot_time, self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedMemorySource:
+    """
+    Frame source reading a SharedMemoryFrameWriter's ring. Each frame is
+    copied (or mirrored) once into a reused buffer; frames the writer
+    overwrote during the copy are dropped and counted in frames_torn.
+    """
+
+    # Frames arrive at the writer's capture rate
+    realtime = True
+    # The writer process already captures in the background
+    needs_capture_thread = False
+
+    def __init__(self, name, mirror=False, poll_interval=0.001, timeout=5.0):
+        """
+        Args:
+            timeout: Give up when no new frame arrives for this many seconds
+        """
+        self.shm = _attach(name)
+        header = np.ndarray((HEADER_FIELDS,), np.int64, self.shm.buf, 0)
+        if header[VERSION_FIELD] != VERSION:
+            raise RuntimeError(f"Shared memory block {name} is not a frame ring")
+        shape = tuple(int(v) for v in header[HEIGHT:CHANNELS + 1])
+        self.slots = int(header[SLOTS])
+        self.header, self.slot_seq, self.slot_time, self.frames = _views(self.shm.buf, self.slots, shape)
+
+        self.mirror = mirror
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.last_timestamp = None
+        self.last_seq = -1
+        self.frames_dropped = 0
+        self.frames_torn = 0
+
+    def read_frame(self):
+        return self.read_frame_into(None)
+
+    def read_frame_into(self, dst):
+        """
+        Wait for a frame newer than the last one and copy it into `dst`
+        (a new array if None or the wrong shape). Returns the frame, or
+        None once the writer has closed the ring or stopped writing.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            seq = int(self.header[WRITE_SEQ]) - 1
+            if seq > self.last_seq:
+                index = self._lease(seq)
+                if index is not None:
+                    frame, timestamp = self._copy(index, dst)
+                    # Seqlock: unchanged sequence number = not written meanwhile
+                    if self.slot_seq[index] == seq:
+                        break
+                    self.frames_torn += 1
+            elif self.header[CLOSED]:
+                return None
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+        if self.last_seq >= 0:
+            self.frames_dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        self.last_timestamp = timestamp
+        return frame
+
+    def _copy(self, index, dst):
+        slot = self.frames[index]
+        if dst is None or dst.shape != slot.shape:
+            dst = np.empty_like(slot)
+        if self.mirror:
+            cv2.flip(slot, 1, dst)
+        else:
+            np.copyto(dst, slot)
+        return dst, float(self.slot_time[index])
+
+    def _lease(self, seq):
+        """Lease the slot holding `seq`; None if it was overwritten meanwhile."""
+        matches = np.flatnonzero(self.slot_seq == seq)
+        if len(matches) == 0:
+            return None
+        index = int(matches[0])
+        self.header[LEASED] = index
+        # Still the same frame once the writer can see the lease
+        if self.slot_seq[index] != seq:
+            return None
+        return index
+
+    def seek(self, seconds):
+        raise ValueError("A shared-memory feed cannot seek")
+
+    def release(self):
+        self.header[LEASED] = -1
+        del self.header, self.slot_seq, self.slot_time, self.frames
+        self.shm.close()
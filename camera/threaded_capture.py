@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import namedtuple
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+# A frame handed out by the ring, with its capture time and sequence number
+CapturedFrame = namedtuple("CapturedFrame", ["image", "timestamp", "seq"])
+
+
+class FrameRing:
+    """
+    Fixed-size ring of preallocated frame buffers shared between one
+    producer (capture thread) and one consumer (processing loop).
+
+    Policies:
+        drop_oldest: the producer never waits; the consumer always gets the
+                     newest frame and any unread older frames are dropped.
+        block:       the producer waits for a free slot; the consumer gets
+                     every frame in capture order.
+
+    The slot last handed to the consumer stays leased until the next get(),
+    so the consumer can draw on it without the producer overwriting it.
+    """
+
+    def __init__(self, capacity=4, policy=DROP_OLDEST):
+        # One slot leased by the consumer, one holding the newest unread
+        # frame and one being written: with fewer, drop_oldest would
+        # overwrite the newest frame while the consumer reads it
+        if capacity < 3:
+            raise ValueError("FrameRing capacity must be at least 3")
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown frame ring policy: {policy}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self._slots = [None] * capacity
+        self._slot_seq = [-1] * capacity
+        self._slot_time = [0.0] * capacity
+        self._cond = threading.Condition()
+        self._write_seq = 0   # Sequence number of the next frame to be written
+        self._read_seq = 0    # Sequence number the consumer expects next
+        self._leased = None   # Slot currently held by the consumer
+        self._closed = False
+
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+    def allocate(self, template):
+        """Preallocate every slot with the shape/dtype of a template frame."""
+        for i in range(self.capacity):
+            self._slots[i] = template.copy()
+
+    def acquire_write_slot(self):
+        """
+        Return (index, buffer) of the slot the producer should fill next,
+        or None if the ring was closed while waiting.
+        """
+        with self._cond:
+            if self.policy == BLOCK:
+                # Keep one slot free for the consumer's lease
+                while (not self._closed and
+                       self._write_seq - self._read_seq >= self.capacity - 1):
+                    self._cond.wait()
+            if self._closed:
+                return None
+
+            # Oldest slot that the consumer is not holding
+            index = min(
+                (i for i in range(self.capacity) if i != self._leased),
+                key=lambda i: self._slot_seq[i]
+            )
+            return index, self._slots[index]
+
+    def commit(self, index, frame, timestamp):
+        """Publish a filled slot as the newest frame."""
+        with self._cond:
+            self._slots[index] = frame
+            self._slot_seq[index] = self._write_seq
+            self._slot_time[index] = timestamp
+            self._write_seq += 1
+            self.frames_captured += 1
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Wait for an unread frame and return it as a CapturedFrame.
+        Returns None when the ring is closed and drained, or on timeout.
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.time() + timeout
+            while self._write_seq <= self._read_seq:
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            if self.policy == DROP_OLDEST:
+                seq = self._write_seq - 1
+            else:
+                seq = self._read_seq
+
+            index = self._slot_seq.index(seq)
+            self.frames_dropped += seq - self._read_seq
+            self._read_seq = seq + 1
+            self._leased = index
+            self._cond.notify_all()
+
+            return CapturedFrame(self._slots[index], self._slot_time[index], seq)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ThreadedCapture:
+    """
+    Runs camera reads on a background thread so capture never waits on
+    detection. Exposes the same read_frame() interface as CameraManager.
+    Frames are stamped with the source's last_timestamp (capture time for
+    a camera, playback time for recordings).
+    """
+
+    def __init__(self, camera_manager, ring_size=4, policy=DROP_OLDEST):
+        self.camera = camera_manager
+        self.ring = FrameRing(ring_size, policy)
+        self.last_timestamp = None
+        self.last_seq = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        # However capture ends (including on an error), close the ring so
+        # the consumer's read() returns None instead of waiting forever
+        try:
+            self._capture_frames()
+        finally:
+            self.ring.close()
+
+    def _capture_frames(self):
+        first = self.camera.read_frame()
+        if first is None:
+            return
+
+        # Size the ring from the first frame; every slot starts as a copy of it
+        self.ring.allocate(first)
+        index, buffer = self.ring.acquire_write_slot()
+        self.ring.commit(index, buffer, self.camera.last_timestamp)
+
+        while True:
+            slot = self.ring.acquire_write_slot()
+            if slot is None:
+                break
+            index, buffer = slot
+
+            # Decode straight into the ring buffer
+            frame = self.camera.read_frame_into(buffer)
+            if frame is None:
+                break
+            self.ring.commit(index, frame, self.camera.last_timestamp)
+
+    def read(self, timeout=None):
+        """Return the next CapturedFrame, or None when capture has ended."""
+        captured = self.ring.get(timeout)
+        if captured is not None:
+            self.last_timestamp = captured.timestamp
+            self.last_seq = captured.seq
+        return captured
+
+    def read_frame(self):
+        captured = self.read()
+        return None if captured is None else captured.image
+
+    @property
+    def frames_captured(self):
+        return self.ring.frames_captured
+
+    @property
+    def frames_dropped(self):
+        return self.ring.frames_dropped
+
+    def stop(self):
+        self.ring.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
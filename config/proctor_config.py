@@ -0,0 +1,168 @@
+import json
+import math
+import os
+import time
+from collections import namedtuple
+import config.settings as settings
+from violations.violation_types import ViolationType
+
+# Proctoring policy: the thresholds and timings that decide violations.
+# Defaults come from config/settings.py; a session gets its own immutable
+# ProctorConfig, so sessions in one process can run different policies.
+FIELDS = {
+    # name: (type, choices or minimum)
+    "test_duration_seconds": (float, 0),
+    "max_violations": (int, 1),
+    "max_violations_per_type": (dict, ViolationType),
+    "face_min_area_ratio": (float, 0),
+    "face_max_area_ratio": (float, 0),
+    "head_pose_method": (str, ("ratio", "pnp")),
+    "head_yaw_threshold": (float, 0),
+    "head_pitch_threshold": (float, 0),
+    "head_yaw_degrees": (float, 0),
+    "head_pitch_degrees": (float, 0),
+    "eye_movement_check": (bool, None),
+    "eye_movement_threshold": (float, 0),
+    "eye_vertical_threshold": (float, 0),
+    "smoothing": (bool, None),
+    "landmark_min_cutoff": (float, 0.01),
+    "landmark_beta": (float, 0),
+    "box_smoothing_seconds": (float, 0),
+    "hysteresis_margin": (float, 0),
+    "no_face_delay": (float, 0),
+    "multiple_faces_delay": (float, 0),
+    "face_distance_delay": (float, 0),
+    "no_face_grace_period": (float, 0),
+    "violation_grace_period": (float, 0),
+    "head_movement_grace_period": (float, 0),
+    "eye_movement_grace_period": (float, 0),
+}
+
+_ProctorConfigBase = namedtuple("ProctorConfig", list(FIELDS))
+
+
+class ProctorConfig(_ProctorConfigBase):
+    __slots__ = ()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(**{name: getattr(settings, name.upper()) for name in FIELDS}).validated()
+
+    def replace(self, **overrides):
+        """New validated config with some fields changed (names are case-insensitive)."""
+        overrides = {name.lower(): value for name, value in overrides.items()}
+        unknown = set(overrides) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown config fields: {sorted(unknown)}")
+        return self._replace(**overrides).validated()
+
+    def validated(self):
+        """Return a copy with values coerced to their types; raises ValueError if invalid."""
+        values = {}
+        for name, (kind, rule) in FIELDS.items():
+            value = getattr(self, name)
+            if kind is dict:
+                value = _type_limits(name, value, rule)
+            elif kind is bool:
+                if not isinstance(value, bool):
+                    raise ValueError(f"{name} must be true or false, got {value!r}")
+            elif kind is str:
+                if value not in rule:
+                    raise ValueError(f"{name} must be one of {rule}, got {value!r}")
+            else:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"{name} must be a number, got {value!r}")
+                # NaN would pass every comparison below
+                if not math.isfinite(value):
+                    raise ValueError(f"{name} must be finite, got {value!r}")
+                if kind is int and value != int(value):
+                    raise ValueError(f"{name} must be a whole number, got {value!r}")
+                value = kind(value)
+                if value < rule:
+                    raise ValueError(f"{name} must be >= {rule}, got {value!r}")
+            values[name] = value
+
+        if values["face_min_area_ratio"] >= values["face_max_area_ratio"]:
+            raise ValueError("face_min_area_ratio must be below face_max_area_ratio")
+        if values["hysteresis_margin"] >= 1:
+            raise ValueError("hysteresis_margin must be below 1")
+        return self._replace(**values)
+
+    def changes(self, other):
+        """Names of fields that differ from another config."""
+        return [name for name in FIELDS if getattr(self, name) != getattr(other, name)]
+
+
+def _type_limits(name, value, types):
+    """{type code or message: limit} -> sorted tuple of (code, limit) pairs."""
+    try:
+        items = dict(value).items()
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must map violation types to limits, got {value!r}")
+    limits = {}
+    for key, limit in items:
+        code = types.parse(key).code
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            raise ValueError(f"{name}[{code}] must be a whole number >= 1, got {limit!r}")
+        limits[code] = limit
+    return tuple(sorted(limits.items()))
+
+
+DEFAULT_CONFIG = ProctorConfig.from_settings()
+
+
+def load_config(path, base=DEFAULT_CONFIG):
+    """
+    Load a JSON file of overrides on top of `base`, e.g.
+        {"head_yaw_threshold": 0.12, "max_violations": 10,
+         "max_violations_per_type": {"EYE_MOVEMENT": 3}}
+    Setting names in upper case (HEAD_YAW_THRESHOLD) are accepted too.
+    """
+    with open(path) as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    return base.replace(**overrides)
+
+
+class ConfigWatcher:
+    """
+    Hot reload for a config file. Call poll() between frames: at most every
+    `interval` seconds it checks the file's mtime and, if it changed, loads
+    and validates the new config. An invalid file is reported and the
+    previous config stays in effect.
+    """
+
+    def __init__(self, path, base=DEFAULT_CONFIG, interval=1.0, clock=time.monotonic):
+        self.path = path
+        self.base = base
+        self.interval = interval
+        self.clock = clock
+        self._mtime = os.path.getmtime(path)
+        self._last_check = clock()
+        self.config = load_config(path, base)
+
+    def poll(self):
+        """Return (config, changed)."""
+        now = self.clock()
+        if now - self._last_check < self.interval:
+            return self.config, False
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return self.config, False
+        if mtime == self._mtime:
+            return self.config, False
+        self._mtime = mtime
+
+        try:
+            config = load_config(self.path, self.base)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Ignoring invalid config {self.path}: {e}")
+            return self.config, False
+
+        changed = config != self.config
+        self.config = config
+        return config, changed
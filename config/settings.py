@@ -5,17 +5,111 @@ FACE_ALIGNMENT_GRACE_PERIOD = 3
 VIOLATION_GRACE_PERIOD = 3
 
 MAX_VIOLATIONS = 30
+MAX_VIOLATIONS_PER_TYPE = {}      # Per-type limits, e.g. {"EYE_MOVEMENT": 10}
+
+# Violation bookkeeping (memory stays constant however long the test runs)
+VIOLATION_DISPLAY_SECONDS = 3     # How long a violation stays on screen
+VIOLATION_HISTORY_SECONDS = 600   # Longest window rolling queries can cover
+VIOLATION_RECORDS_KEPT = 100      # Most recent violations kept in memory (the event log has all)
 
 FACE_MIN_AREA_RATIO = 0.05
 FACE_MAX_AREA_RATIO = 0.22
 
+# Detection resolution
+PROXY_MAX_WIDTH = 640         # Detect on frames downscaled to this width (None = full resolution)
+
+# Startup
+STARTUP_TARGET_SECONDS = 3.0  # Warn if the first frame takes longer than this after launch (None = off)
+
+# Face tracking
+FACE_TRACKING = True          # Search a ROI around the last face between full detections
+FACE_REDETECT_INTERVAL = 10   # Full-frame cascade every N runs while tracking; a second face outside
+                              # the ROI can be missed until then (MULTIPLE_FACES up to N-1 runs late)
+FACE_TRACK_PADDING = 0.5      # ROI padding as a fraction of the face size
+
+# Face mesh
+FACE_MESH_RUNNING_MODE = "VIDEO"   # "IMAGE", "VIDEO" or "LIVE_STREAM"
+FACE_MESH_MAX_RESULT_AGE_MS = 500  # LIVE_STREAM: drop results older than this
+
+# Face counting
+FACE_COUNT_METHOD = "landmarks"  # "landmarks" (one multi-face mesh pass) or "haar" (cascade + single-face mesh)
+FACE_MESH_MAX_FACES = 3          # landmarks: most faces found per frame; 2 is enough to flag MULTIPLE_FACES
+LANDMARK_BOX_SCALE = 1.33        # landmarks: grow landmark boxes to cascade box size (keeps FACE_*_AREA_RATIO)
+
+# Detector sampling (runs per second, None = every frame)
+FACE_DETECT_RATE_HZ = 15
+FACE_DETECT_BOOSTED_RATE_HZ = 30 # While a no-face, multiple-faces or distance timer is armed
+LANDMARK_RATE_HZ = 10
+LANDMARK_BOOSTED_RATE_HZ = 30    # While a head or eye timer (landmarks counting: any face timer) is armed
+# CPU milliseconds per second each detector may use (None = no cap); a slow
+# machine gets a lower rate instead of a lagging loop, boosted or not
+FACE_DETECT_BUDGET_MS = 150
+LANDMARK_BUDGET_MS = 250
+
 # Head pose
+HEAD_POSE_METHOD = "ratio"    # "ratio" (landmark offsets) or "pnp" (solvePnP angles)
 HEAD_YAW_THRESHOLD = 0.10     # 10% left/right
 HEAD_PITCH_THRESHOLD = 0.06   # 6% up/down
+HEAD_YAW_DEGREES = 25         # pnp only
+HEAD_PITCH_DEGREES = 20       # pnp only
+
+# Eye movement (iris offset from eye centre, -1..1)
+EYE_MOVEMENT_CHECK = True
+EYE_MOVEMENT_THRESHOLD = 0.35     # left/right
+EYE_VERTICAL_THRESHOLD = 0.6      # up/down
 
-# Eye movement
-EYE_MOVEMENT_THRESHOLD = 0.35
+# Temporal smoothing of detector outputs
+SMOOTHING = True                  # Smooth landmarks / boxes and add hysteresis
+LANDMARK_MIN_CUTOFF = 1.0         # One Euro cutoff (Hz) while still; lower = smoother
+LANDMARK_BETA = 10.0              # Cutoff increase per unit/s of landmark speed
+BOX_SMOOTHING_SECONDS = 0.2       # Face box EMA time constant (0 = off)
+HYSTERESIS_MARGIN = 0.1           # Dead band around each limit, as a fraction of it
 
 # Timers
+NO_FACE_DELAY = 1.5               # No face this long before it counts
+MULTIPLE_FACES_DELAY = 1
+FACE_DISTANCE_DELAY = 1
 HEAD_MOVEMENT_GRACE_PERIOD = 1.0
 EYE_MOVEMENT_GRACE_PERIOD = 1.0
+
+# Frame source
+FRAME_SOURCE = "0"                 # Camera index, video file, image directory or "shm:NAME"
+SOURCE_SPEED = 1.0                 # Playback speed for recordings (0 = as fast as possible)
+SOURCE_STEP = 1                    # Keep every Nth frame of a recording
+IMAGE_SEQUENCE_FPS = 30            # Frame rate assumed for image directories
+
+# Capture
+CAPTURE_THREADED = True            # Read the camera on a background thread
+CAPTURE_RING_SIZE = 4              # Preallocated frame buffers in the ring (at least 3)
+CAPTURE_DROP_POLICY = "drop_oldest"  # "drop_oldest" or "block"
+
+# Phone detection
+PHONE_CONFIDENCE = 0.5
+PHONE_BATCH_SIZE = 8             # Max frames per batched YOLO call
+PHONE_BATCH_DEADLINE_MS = 50     # Max wait for a batch to fill
+PHONE_CHECK_RATE_HZ = 0          # Server: phone checks per candidate per second (0 = off)
+
+# Preview output (never throttles detection)
+PREVIEW_MODE = "window"          # "window", "mjpeg" or "none" (headless)
+PREVIEW_MJPEG_PATH = "preview.avi"
+PREVIEW_MJPEG_FPS = 5            # Frames per second written to the MJPEG file
+
+# Stage profiling
+PROFILE_ENABLED = False
+PROFILE_EXPORT_PATH = None       # e.g. "profile.json" or "profile.prom"
+PROFILE_EXPORT_INTERVAL = 10     # Seconds between exported snapshots
+
+# Violation event log
+EVENT_LOG_PATH = "logs/violations.jsonl"   # Append-only JSONL (None disables)
+EVENT_LOG_FSYNC_INTERVAL = 1.0             # Max seconds between fsyncs
+
+# Evidence snapshots around violations
+EVIDENCE_DIR = None              # Keyframes (face images) per session / violation, e.g. "logs/evidence"; opt-in
+EVIDENCE_BUFFER_MB = 32          # Memory for recent frames
+EVIDENCE_PRE_SECONDS = 3.0       # Seconds kept before a violation
+EVIDENCE_POST_SECONDS = 2.0      # Seconds kept after a violation
+EVIDENCE_SAMPLE_FPS = 5          # Frames per second sampled into the buffer
+
+# Runtime config file (JSON overrides for ProctorConfig, reloaded when it changes)
+CONFIG_PATH = None
+CONFIG_RELOAD_INTERVAL = 1.0     # Seconds between checks for changes
@@ -1,57 +1,122 @@
-import cv2
-import os
 import numpy as np
-from config.settings import EYE_MOVEMENT_THRESHOLD
+from detectors.landmarks import as_landmark_array, NUM_LANDMARKS
+from detectors.model_registry import models
+from utils.frame_packet import to_gray
+from config.proctor_config import DEFAULT_CONFIG
+
+# MediaPipe FaceLandmarker indices (478-point model with irises), one row per eye:
+# corner, opposite corner, upper lid, lower lid, iris centre
+EYE_POINTS = np.array([
+    (33, 133, 159, 145, 468),
+    (362, 263, 386, 374, 473),
+])
+
+# Eye opening (lid gap / eye width) below which the eye counts as closed
+BLINK_RATIO = 0.12
+
+
+def estimate_gaze_batch(points):
+    """
+    estimate_gaze() for many frames at once: (N, 478, 3) landmarks ->
+    (horizontal, vertical) arrays of length N, NaN where both eyes are
+    closed or the frame has no landmarks (NaN rows).
+    """
+    # (N frames, 2 eyes, 5 points, xy)
+    eyes = points[:, EYE_POINTS, :2]
+    corner_a, corner_b, top, bottom, iris = (eyes[:, :, i] for i in range(5))
+
+    width = corner_b[..., 0] - corner_a[..., 0]
+    height = bottom[..., 1] - top[..., 1]
+    safe_width = np.where(np.abs(width) < 1e-6, 1e-6, width)
+
+    with np.errstate(invalid="ignore"):
+        # Ignore closed (blinking) eyes
+        is_open = np.abs(height) / np.abs(safe_width) >= BLINK_RATIO
+        open_count = is_open.sum(axis=1)
+
+        horizontal = (iris[..., 0] - corner_a[..., 0]) / safe_width
+        vertical = (iris[..., 1] - top[..., 1]) / np.where(is_open, height, 1.0)
+
+        # Mean over the open eyes only
+        horizontal = np.where(is_open, horizontal, 0.0).sum(axis=1) / np.maximum(open_count, 1)
+        vertical = np.where(is_open, vertical, 0.0).sum(axis=1) / np.maximum(open_count, 1)
+
+    closed = open_count == 0
+    horizontal = np.where(closed, np.nan, (horizontal - 0.5) * 2)
+    vertical = np.where(closed, np.nan, (vertical - 0.5) * 2)
+    return horizontal, vertical
+
+
+def estimate_gaze(face_landmarks):
+    """
+    Estimate gaze from FaceLandmarker iris and eye-corner landmarks.
+    Returns (horizontal, vertical) offsets in [-1, 1] where 0 is looking
+    straight ahead, or None if the irises are unavailable or both eyes are
+    closed. No image processing is done.
+    """
+    points = as_landmark_array(face_landmarks)
+    if points is None or len(points) < NUM_LANDMARKS:
+        return None
+
+    horizontal, vertical = estimate_gaze_batch(points[None])
+    if np.isnan(horizontal[0]):
+        return None
+    return float(horizontal[0]), float(vertical[0])
+
+
+def is_gaze_suspicious(face_landmarks, config=DEFAULT_CONFIG):
+    """
+    Returns True if the irises show the candidate looking away from the
+    screen. Uses the landmarks already computed for head pose.
+    """
+    gaze = estimate_gaze(face_landmarks)
+    if gaze is None:
+        return False
+
+    horizontal, vertical = gaze
+    return abs(horizontal) > config.eye_movement_threshold or abs(vertical) > config.eye_vertical_threshold
+
 
 def is_eye_movement_suspicious(frame):
     """
     Detects if eyes are looking away from the screen.
     Uses simple eye detection based on face region analysis.
     Returns True if gaze direction is suspicious (looking away).
+
+    Prefer is_gaze_suspicious(), which reuses FaceLandmarker output instead
+    of running two more cascades over the frame.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    cascade_path = os.path.join(current_dir, "haarcascade_frontalface_default.xml")
-
-    eye_cascade_path = os.path.join(current_dir, "haarcascade_eye.xml")
-    # Load face and eye cascade classifiers
-    face_cascade = cv2.CascadeClassifier(cascade_path)
-    eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
-    
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-    
+    gray = to_gray(frame)
+    faces = models.require("face_cascade").detectMultiScale(gray, 1.3, 5)
+
     if len(faces) == 0:
         return False
-    
+
     # Get the first (largest) face
     face = faces[0]
     x, y, w, h = face
     roi_gray = gray[y:y+h, x:x+w]
-    
+
     # Detect eyes within face region
-    eyes = eye_cascade.detectMultiScale(roi_gray, 1.1, 4)
-    
+    eyes = models.require("eye_cascade").detectMultiScale(roi_gray, 1.1, 4)
+
     if len(eyes) < 2:
         # Not enough eyes detected, assume normal gaze
         return False
-    
+
     # Sort eyes by x position (left to right)
     eyes = sorted(eyes, key=lambda e: e[0])
     left_eye = eyes[0]
     right_eye = eyes[1]
-    
-    # Check if eyes are roughly centered in their regions
-    # If eyes are too far to one side, they might be looking away
-    eye_x_positions = [left_eye[0] + left_eye[2]/2, right_eye[0] + right_eye[2]/2]
-    
+
     # Normalize positions within face ROI
     left_eye_center_ratio = (left_eye[0] + left_eye[2]/2) / w
     right_eye_center_ratio = (right_eye[0] + right_eye[2]/2) / w
-    
+
     # Eyes should be roughly centered (between 0.25 and 0.75 of face width)
     # If ratio is too extreme, eyes are looking to the side
     left_eye_suspicious = left_eye_center_ratio < 0.2 or left_eye_center_ratio > 0.8
     right_eye_suspicious = right_eye_center_ratio < 0.2 or right_eye_center_ratio > 0.8
-    
+
     # Eyes looking away if both are extreme or significantly off-center
     return left_eye_suspicious or right_eye_suspicious
@@ -1,20 +1,122 @@
-import cv2
-import os
-
-current_dir = os.path.dirname(os.path.abspath(__file__))
-cascade_path = os.path.join(current_dir, "haarcascade_frontalface_default.xml")
-FACE_CASCADE = cv2.CascadeClassifier(cascade_path)
-
-if FACE_CASCADE.empty():
-    print("ERROR: Cascade file not loaded properly!")
+import numpy as np
+from detectors.landmarks import as_landmark_array, bounding_box
+from detectors.model_registry import models
+from utils.frame_packet import to_gray
+from config.settings import FACE_REDETECT_INTERVAL, FACE_TRACK_PADDING
 
 
 def detect_faces(frame):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = FACE_CASCADE.detectMultiScale(
+    """Haar face boxes for a BGR frame or a FramePacket (uses its cached gray)."""
+    gray = to_gray(frame)
+    faces = models.require("face_cascade").detectMultiScale(
     gray,
     scaleFactor=1.1,
     minNeighbors=4,
     minSize=(30, 30)
     )
-    return faces
\ No newline at end of file
+    return faces
+
+
+class FaceTracker:
+    """
+    Drop-in replacement for detect_faces() that avoids a full-frame cascade
+    on every frame.
+
+    While exactly one face is being tracked, the cascade only searches a
+    padded ROI around the last box (or the landmark hull, when provided).
+    A full-frame pass still runs every `redetect_interval` frames, whenever
+    tracking is lost, and whenever 0 or several faces were last seen.
+
+    NO_FACE is not delayed (an empty ROI falls back to the full frame), but a
+    second face appearing outside the ROI is only seen at the next full
+    pass, up to `redetect_interval - 1` runs later. With the face detector
+    at 15 Hz and an interval of 10 that is about 0.6 s added to
+    MULTIPLE_FACES_DELAY; lower the interval if that matters.
+    """
+
+    def __init__(self, redetect_interval=FACE_REDETECT_INTERVAL, padding=FACE_TRACK_PADDING):
+        self.redetect_interval = redetect_interval
+        self.padding = padding
+        self.last_faces = ()
+        self.hint_box = None  # (x, y, w, h) from landmarks, refreshes the ROI
+        self.frames_since_full = 0
+        self.full_detections = 0
+        self.roi_detections = 0
+
+    def detect(self, frame):
+        gray = to_gray(frame)
+
+        faces = ()
+        if self._can_track():
+            faces = self._detect_in_roi(gray)
+            self.frames_since_full += 1
+
+        if len(faces) == 0:
+            # First frame, periodic refresh, or tracking confidence dropped
+            faces = models.require("face_cascade").detectMultiScale(
+                gray,
+                scaleFactor=1.1,
+                minNeighbors=4,
+                minSize=(30, 30)
+            )
+            self.frames_since_full = 0
+            self.full_detections += 1
+        else:
+            self.roi_detections += 1
+
+        self.last_faces = faces
+        self.hint_box = None
+        return faces
+
+    def update_from_landmarks(self, face_landmarks, frame_shape):
+        """Use the landmark extents of the tracked face to steer the next ROI."""
+        points = as_landmark_array(face_landmarks)
+        if points is None:
+            return
+        self.hint_box = bounding_box(points, frame_shape)
+
+    def reset(self):
+        self.last_faces = ()
+        self.hint_box = None
+        self.frames_since_full = 0
+
+    def _can_track(self):
+        return (
+            len(self.last_faces) == 1 and
+            self.frames_since_full < self.redetect_interval - 1
+        )
+
+    def _detect_in_roi(self, gray):
+        frame_h, frame_w = gray.shape[:2]
+        x, y, w, h = self.last_faces[0]
+
+        # Union of the last cascade box and the landmark hull
+        x0, y0, x1, y1 = x, y, x + w, y + h
+        if self.hint_box is not None:
+            hx, hy, hw, hh = self.hint_box
+            x0, y0 = min(x0, hx), min(y0, hy)
+            x1, y1 = max(x1, hx + hw), max(y1, hy + hh)
+
+        pad = int(self.padding * max(w, h))
+        x0, y0 = max(0, x0 - pad), max(0, y0 - pad)
+        x1, y1 = min(frame_w, x1 + pad), min(frame_h, y1 + pad)
+        if x1 - x0 < 30 or y1 - y0 < 30:
+            return ()
+
+        # The face can only have changed size so much since the last frame
+        min_side = max(30, int(0.5 * min(w, h)))
+        max_side = int(2.0 * max(w, h))
+        faces = models.require("face_cascade").detectMultiScale(
+            gray[y0:y1, x0:x1],
+            scaleFactor=1.1,
+            minNeighbors=4,
+            minSize=(min_side, min_side),
+            maxSize=(max_side, max_side)
+        )
+        if len(faces) == 0:
+            return ()
+
+        faces = np.asarray(faces)
+        faces[:, 0] += x0
+        faces[:, 1] += y0
+        return faces
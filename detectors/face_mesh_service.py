@@ -1,11 +1,35 @@
-from mediapipe.tasks.python.vision import FaceLandmarker, FaceLandmarkerOptions, RunningMode
+from mediapipe.tasks.python.vision import FaceLandmarker, FaceLandmarkerOptions, FaceLandmarkerResult, RunningMode
 from mediapipe.tasks.python.core.base_options import BaseOptions
+from detectors.model_registry import models
+from detectors.landmarks import landmarks_to_array, face_boxes
+from config.settings import (
+    FACE_MESH_RUNNING_MODE, FACE_MESH_MAX_RESULT_AGE_MS, FACE_COUNT_METHOD, FACE_MESH_MAX_FACES,
+    LANDMARK_BOX_SCALE
+)
 import os
+import threading
+import time
 
-class FaceMeshService:
-    _instance = None
+# Returned in LIVE_STREAM mode until the first (fresh) result arrives
+EMPTY_RESULT = FaceLandmarkerResult(
+    face_landmarks=[],
+    face_blendshapes=[],
+    facial_transformation_matrixes=[]
+)
 
-    def __init__(self):
+class FaceMeshService:
+    def __init__(self, running_mode=FACE_MESH_RUNNING_MODE, max_result_age_ms=FACE_MESH_MAX_RESULT_AGE_MS,
+                 num_faces=None):
+        """
+        Args:
+            running_mode: "IMAGE" (independent frames), "VIDEO" (temporal
+                          tracking, blocking) or "LIVE_STREAM" (detect_async
+                          with a result callback, non-blocking)
+            max_result_age_ms: LIVE_STREAM only - results older than this
+                               relative to the newest frame are discarded
+            num_faces: Most faces to find; defaults to FACE_MESH_MAX_FACES
+                       when faces are counted from landmarks, else 1
+        """
         # Path to the MediaPipe face landmarker model
         model_path = os.path.join(
             os.path.dirname(__file__),
@@ -17,21 +41,97 @@ class FaceMeshService:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Face landmarker model not found: {model_path}")
 
+        if isinstance(running_mode, str):
+            running_mode = RunningMode[running_mode.upper()]
+        self.running_mode = running_mode
+        self.max_result_age_ms = max_result_age_ms
+        if num_faces is None:
+            num_faces = FACE_MESH_MAX_FACES if FACE_COUNT_METHOD == "landmarks" else 1
+        self.num_faces = num_faces
+
+        self._last_timestamp_ms = -1
+        self._lock = threading.Lock()
+        self._latest_result = EMPTY_RESULT
+        self._latest_result_ms = -1
+
         # Base options with model path
         base_opts = BaseOptions(model_asset_path=model_path)
 
-        # Options for IMAGE mode (single frames, like in main.py)
         options = FaceLandmarkerOptions(
             base_options=base_opts,
-            running_mode=RunningMode.IMAGE,
-            num_faces=1
+            running_mode=running_mode,
+            num_faces=num_faces,
+            result_callback=self._on_result if running_mode == RunningMode.LIVE_STREAM else None
         )
 
         # Create the FaceLandmarker instance
         self.mesh = FaceLandmarker.create_from_options(options)
 
+    def detect(self, mp_image, timestamp_ms=None):
+        """
+        Run the landmarker in the configured mode and return a
+        FaceLandmarkerResult.
+
+        In VIDEO and LIVE_STREAM mode `timestamp_ms` should be the frame's
+        capture time; it defaults to the current time and is forced to be
+        strictly increasing as MediaPipe requires. In LIVE_STREAM mode the
+        frame is queued and the latest finished result is returned
+        immediately, so it may lag the submitted frame by a frame or two.
+        """
+        if self.running_mode == RunningMode.IMAGE:
+            return self.mesh.detect(mp_image)
+
+        timestamp_ms = self._next_timestamp(timestamp_ms)
+
+        if self.running_mode == RunningMode.VIDEO:
+            return self.mesh.detect_for_video(mp_image, timestamp_ms)
+
+        self.mesh.detect_async(mp_image, timestamp_ms)
+        return self.latest_result(timestamp_ms)
+
+    def detect_faces(self, mp_image, frame_shape, timestamp_ms=None):
+        """
+        Count faces with the landmarker alone. Returns (boxes, landmarks):
+        an (N, 4) array of pixel boxes derived from each face's landmark
+        extents (scaled to the size of a Haar box) and the matching list
+        of (478, 3) landmark arrays.
+        """
+        result = self.detect(mp_image, timestamp_ms)
+        landmarks = [landmarks_to_array(face) for face in result.face_landmarks]
+        return face_boxes(landmarks, frame_shape, LANDMARK_BOX_SCALE), landmarks
+
+    def latest_result(self, now_ms=None):
+        """Newest LIVE_STREAM result, or an empty result if it is too old."""
+        with self._lock:
+            result, result_ms = self._latest_result, self._latest_result_ms
+        if now_ms is None:
+            now_ms = self._last_timestamp_ms
+        if result_ms < 0 or now_ms - result_ms > self.max_result_age_ms:
+            return EMPTY_RESULT
+        return result
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        with self._lock:
+            self._latest_result = result
+            self._latest_result_ms = timestamp_ms
+
+    def _next_timestamp(self, timestamp_ms):
+        if timestamp_ms is None:
+            timestamp_ms = time.time() * 1000
+        timestamp_ms = int(timestamp_ms)
+        if timestamp_ms <= self._last_timestamp_ms:
+            timestamp_ms = self._last_timestamp_ms + 1
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def close(self):
+        self.mesh.close()
+
+    @classmethod
+    def get_service(cls):
+        """Shared default service, created by the model registry on first use."""
+        return models.get("face_mesh")
+
     @classmethod
     def get(cls):
-        if cls._instance is None:
-            cls._instance = FaceMeshService()
-        return cls._instance.mesh
+        return cls.get_service().mesh
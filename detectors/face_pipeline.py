@@ -0,0 +1,60 @@
+"""
+Face count, boxes and landmarks for one frame, shared by the live loop,
+the batch engine, the server and the benchmarks so they can't drift apart.
+Nothing here imports MediaPipe; the landmarker is passed in.
+"""
+from contextlib import nullcontext
+from detectors.face_detector import detect_faces
+from detectors.landmarks import landmarks_to_array
+from config.settings import FACE_COUNT_METHOD
+
+
+def _untimed(name):
+    return nullcontext()
+
+
+def single_face_landmarks(packet, face_mesh, timestamp_ms=None, tracker=None, stage=_untimed):
+    """
+    Landmarker on a FramePacket already known to hold one face: its
+    (478, 3) landmark array, or None if the landmarker found nothing.
+    Steers `tracker` (a FaceTracker), if given, with the landmarks.
+    """
+    with stage("convert"):
+        mp_image = packet.mp_image
+    with stage("face_mesh"):
+        result = face_mesh.detect(mp_image, timestamp_ms)
+    if not result.face_landmarks:
+        return None
+    # One (478, 3) array per frame, shared by every consumer
+    face_landmarks = landmarks_to_array(result.face_landmarks[0])
+    if tracker is not None:
+        tracker.update_from_landmarks(face_landmarks, packet.shape)
+    return face_landmarks
+
+
+def detect_faces_and_landmarks(packet, face_mesh, timestamp_ms=None, tracker=None, method=FACE_COUNT_METHOD,
+                               stage=_untimed):
+    """
+    Detector outputs for one FramePacket: (faces, face_landmarks), with
+    boxes in the packet's pixels and the landmark array of the face when
+    there is exactly one (else None).
+
+    method="landmarks" takes both from a single multi-face landmarker
+    pass; "haar" counts faces with the cascade (or `tracker`, a
+    FaceTracker) and runs the landmarker only when there is one face.
+    `stage` (e.g. StageProfiler.stage) times the "faces", "convert" and
+    "face_mesh" steps.
+    """
+    if method == "landmarks":
+        with stage("convert"):
+            mp_image = packet.mp_image
+        with stage("face_mesh"):
+            faces, landmarks = face_mesh.detect_faces(mp_image, packet.shape, timestamp_ms)
+        return faces, landmarks[0] if len(landmarks) == 1 else None
+
+    with stage("faces"):
+        faces = tracker.detect(packet) if tracker is not None else detect_faces(packet)
+    face_landmarks = None
+    if len(faces) == 1:
+        face_landmarks = single_face_landmarks(packet, face_mesh, timestamp_ms, tracker, stage)
+    return faces, face_landmarks
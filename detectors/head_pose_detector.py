@@ -1,4 +1,7 @@
-from config.settings import HEAD_YAW_THRESHOLD, HEAD_PITCH_THRESHOLD
+import cv2
+import numpy as np
+from detectors.landmarks import as_landmark_array
+from config.proctor_config import DEFAULT_CONFIG
 
 # MediaPipe landmark indices
 NOSE_TIP = 1
@@ -6,29 +9,113 @@ LEFT_CHEEK = 234
 RIGHT_CHEEK = 454
 FOREHEAD = 10
 CHIN = 152
+EYE_OUTER_A = 33      # outer eye corner on the image-left side
+EYE_OUTER_B = 263     # outer eye corner on the image-right side
+MOUTH_A = 61          # mouth corner on the image-left side
+MOUTH_B = 291         # mouth corner on the image-right side
+
+RATIO_POINTS = [NOSE_TIP, LEFT_CHEEK, RIGHT_CHEEK, FOREHEAD, CHIN]
+PNP_POINTS = [NOSE_TIP, CHIN, EYE_OUTER_A, EYE_OUTER_B, MOUTH_A, MOUTH_B]
+
+# Generic 3D face model (mm) for PNP_POINTS, in camera axes:
+# x right, y down, z away from the camera, nose tip at the origin
+FACE_MODEL_3D = np.array([
+    (0.0, 0.0, 0.0),
+    (0.0, 330.0, 65.0),
+    (-225.0, -170.0, 135.0),
+    (225.0, -170.0, 135.0),
+    (-150.0, 150.0, 125.0),
+    (150.0, 150.0, 125.0),
+], dtype=np.float64)
 
-def is_head_straight(landmarks):
-    if not landmarks or len(landmarks) < 455:
-        return False
 
-    nose = landmarks[NOSE_TIP]
-    left_cheek = landmarks[LEFT_CHEEK]
-    right_cheek = landmarks[RIGHT_CHEEK]
-    forehead = landmarks[FOREHEAD]
-    chin = landmarks[CHIN]
-
-    # --- Horizontal rotation (Yaw) ---
-    mid_cheeks_x = (left_cheek.x + right_cheek.x) / 2
-    face_width = abs(right_cheek.x - left_cheek.x)
-    yaw = (nose.x - mid_cheeks_x) / face_width  # normalized relative to face width
-
-    # --- Vertical rotation (Pitch) ---
-    mid_forehead_chin_y = (forehead.y + chin.y) / 2
-    face_height = abs(chin.y - forehead.y)
-    pitch = (nose.y - mid_forehead_chin_y) / face_height  # normalized relative to face height
-
-    # Check thresholds
-    return (
-        abs(yaw) <= HEAD_YAW_THRESHOLD and
-        abs(pitch) <= HEAD_PITCH_THRESHOLD
+def head_pose_ratios_batch(points):
+    """
+    head_pose_ratios() for many frames at once: (N, 478, 3) landmarks ->
+    (yaw, pitch) arrays of length N. Frames without landmarks should be NaN.
+    """
+    nose, left_cheek, right_cheek, forehead, chin = (
+        points[:, index, :2] for index in RATIO_POINTS
     )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # --- Horizontal rotation (Yaw) ---
+        face_width = np.abs(right_cheek[:, 0] - left_cheek[:, 0])
+        yaw = (nose[:, 0] - (left_cheek[:, 0] + right_cheek[:, 0]) / 2) / face_width
+
+        # --- Vertical rotation (Pitch) ---
+        face_height = np.abs(chin[:, 1] - forehead[:, 1])
+        pitch = (nose[:, 1] - (forehead[:, 1] + chin[:, 1]) / 2) / face_height
+
+    return yaw, pitch
+
+
+def head_pose_ratios(landmarks):
+    """
+    Cheap yaw/pitch proxies: nose offset from the cheek / forehead-chin
+    midpoints, normalized by face width / height.
+    """
+    points = as_landmark_array(landmarks)
+    yaw, pitch = head_pose_ratios_batch(points[None])
+    return float(yaw[0]), float(pitch[0])
+
+
+def estimate_head_pose(landmarks, frame_shape):
+    """
+    Estimate head rotation with solvePnP against a generic face model.
+    Returns (yaw, pitch, roll) in degrees (0, 0, 0 = facing the camera),
+    or None if the solver fails.
+    """
+    points = as_landmark_array(landmarks)
+    h, w = frame_shape[:2]
+    image_points = (points[PNP_POINTS, :2] * (w, h)).astype(np.float64)
+
+    # Pinhole camera with focal length ~ image width, no lens distortion
+    camera_matrix = np.array([
+        [w, 0, w / 2],
+        [0, w, h / 2],
+        [0, 0, 1],
+    ], dtype=np.float64)
+
+    ok, rotation_vec, _ = cv2.solvePnP(
+        FACE_MODEL_3D, image_points, camera_matrix, None,
+        flags=cv2.SOLVEPNP_EPNP
+    )
+    if not ok:
+        return None
+
+    rotation, _ = cv2.Rodrigues(rotation_vec)
+    pitch, yaw, roll = cv2.RQDecomp3x3(rotation)[0]
+    return yaw, pitch, roll
+
+
+def head_pose(landmarks, frame_shape=None, config=DEFAULT_CONFIG):
+    """
+    (yaw, pitch, yaw_limit, pitch_limit) by the configured method, in
+    degrees for "pnp" and ratios otherwise. None if there is no usable pose.
+    """
+    points = as_landmark_array(landmarks)
+    if points is None or len(points) < 455:
+        return None
+
+    if config.head_pose_method == "pnp" and frame_shape is not None:
+        pose = estimate_head_pose(points, frame_shape)
+        if pose is None:
+            return None
+        yaw, pitch, _ = pose
+        return yaw, pitch, config.head_yaw_degrees, config.head_pitch_degrees
+
+    yaw, pitch = head_pose_ratios(points)
+    return yaw, pitch, config.head_yaw_threshold, config.head_pitch_threshold
+
+
+def pose_within_limits(pose, scale=1.0):
+    """True if a head_pose() result is within its limits, scaled by `scale`."""
+    if pose is None:
+        return False
+    yaw, pitch, yaw_limit, pitch_limit = pose
+    return abs(yaw) <= yaw_limit * scale and abs(pitch) <= pitch_limit * scale
+
+
+def is_head_straight(landmarks, frame_shape=None, config=DEFAULT_CONFIG):
+    return pose_within_limits(head_pose(landmarks, frame_shape, config))
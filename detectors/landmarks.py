@@ -0,0 +1,71 @@
+import numpy as np
+
+# Number of points produced by the FaceLandmarker model (468 mesh + 10 iris)
+NUM_LANDMARKS = 478
+
+
+def landmarks_to_array(face_landmarks):
+    """
+    Convert one face's FaceLandmarker output (a list of NormalizedLandmark)
+    into an (N, 3) float32 array of normalized x, y, z.
+
+    Do this once per frame; head pose, gaze, tracking and drawing all
+    index the array instead of reading landmark attributes one by one.
+    """
+    count = len(face_landmarks)
+    points = np.fromiter(
+        (v for lm in face_landmarks for v in (lm.x, lm.y, lm.z)),
+        dtype=np.float32,
+        count=count * 3
+    )
+    return points.reshape(count, 3)
+
+
+def as_landmark_array(face_landmarks):
+    """Return landmarks as an (N, 3) array, converting a landmark list if needed."""
+    if face_landmarks is None:
+        return None
+    if isinstance(face_landmarks, np.ndarray):
+        return face_landmarks
+    if len(face_landmarks) == 0:
+        return None
+    return landmarks_to_array(face_landmarks)
+
+
+def has_landmarks(face_landmarks):
+    """Truth test that works for both landmark lists and arrays."""
+    return face_landmarks is not None and len(face_landmarks) > 0
+
+
+def to_pixels(points, frame_shape):
+    """Normalized (N, 3) landmarks -> (N, 2) int32 pixel coordinates."""
+    h, w = frame_shape[:2]
+    return (points[:, :2] * (w, h)).astype(np.int32)
+
+
+def bounding_box(points, frame_shape):
+    """Pixel (x, y, w, h) box around the landmarks, clipped to the frame."""
+    h, w = frame_shape[:2]
+    x0, y0 = points[:, :2].min(axis=0)
+    x1, y1 = points[:, :2].max(axis=0)
+    x0, x1 = int(max(0.0, x0) * w), int(min(1.0, x1) * w)
+    y0, y1 = int(max(0.0, y0) * h), int(min(1.0, y1) * h)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def face_boxes(faces, frame_shape, scale=1.0):
+    """
+    (N, 4) int32 pixel (x, y, w, h) boxes, one per landmark array in
+    `faces`, grown by `scale` about their centre and clipped to the frame.
+    """
+    h, w = frame_shape[:2]
+    boxes = np.empty((len(faces), 4), dtype=np.int32)
+    for i, points in enumerate(faces):
+        x0, y0 = points[:, :2].min(axis=0)
+        x1, y1 = points[:, :2].max(axis=0)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        half_w, half_h = (x1 - x0) * scale / 2, (y1 - y0) * scale / 2
+        left, right = int(max(0.0, cx - half_w) * w), int(min(1.0, cx + half_w) * w)
+        top, bottom = int(max(0.0, cy - half_h) * h), int(min(1.0, cy + half_h) * h)
+        boxes[i] = left, top, right - left, bottom - top
+    return boxes
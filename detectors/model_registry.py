@@ -0,0 +1,117 @@
+"""
+Process-wide registry of the models (MediaPipe landmarker, YOLO, Haar
+cascades).
+
+Nothing is imported or loaded until a model is first asked for, so a
+detector that is switched off costs no import time and no memory. Models
+can also be warmed up on a background thread while the camera opens;
+get() then only waits for whatever is still loading.
+
+    from detectors.model_registry import models
+    models.warm_up(["face_mesh"])
+    ...
+    face_mesh = models.get("face_mesh")
+    models.load_times()   # {"face_mesh": 0.41}
+"""
+import os
+import threading
+import time
+from functools import partial
+
+
+def _load_cascade(file_name):
+    import cv2
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+    cascade = cv2.CascadeClassifier(path)
+    if cascade.empty():
+        raise RuntimeError(f"Cascade file not loaded properly: {path}")
+    return cascade
+
+
+def _load_face_mesh():
+    from detectors.face_mesh_service import FaceMeshService
+    return FaceMeshService()
+
+
+def _load_phone_model():
+    from ultralytics import YOLO
+    return YOLO('yolov8n.pt')  # nano model for speed
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._errors = {}
+        self._load_times = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Add a model; `loader` is called with no arguments on first use."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        """
+        The loaded model, loading it now if needed (blocks while another
+        thread is loading it). Returns None if loading failed.
+        """
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                print(f"Warning: Could not load {name} model: {e}")
+                self._errors[name] = e
+                model = None
+            self._load_times[name] = time.perf_counter() - start
+            self._models[name] = model
+            return model
+
+    def require(self, name):
+        """Like get(), but raises if the model could not be loaded."""
+        model = self.get(name)
+        if model is None:
+            raise RuntimeError(f"{name} model is required but failed to load") from self._errors.get(name)
+        return model
+
+    def warm_up(self, names):
+        """Load models on a background thread; returns the thread."""
+        thread = threading.Thread(
+            target=lambda: [self.get(name) for name in names],
+            name="model-warm-up",
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def error(self, name):
+        """Exception raised while loading a model, if any."""
+        return self._errors.get(name)
+
+    def load_times(self):
+        """Seconds spent loading each model that has been loaded."""
+        return dict(self._load_times)
+
+    def format_load_times(self):
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self._load_times.items())
+
+
+models = ModelRegistry()
+models.register("face_mesh", _load_face_mesh)
+models.register("phone", _load_phone_model)
+models.register("face_cascade", partial(_load_cascade, "haarcascade_frontalface_default.xml"))
+models.register("eye_cascade", partial(_load_cascade, "haarcascade_eye.xml"))
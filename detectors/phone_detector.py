@@ -1,39 +1,134 @@
-import cv2
-import numpy as np
-from ultralytics import YOLO
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from detectors.model_registry import models
+from config.settings import PHONE_CONFIDENCE, PHONE_BATCH_SIZE, PHONE_BATCH_DEADLINE_MS
+
+# Class 67 is "cell phone" in the COCO dataset
+PHONE_CLASS_ID = 67
+
+# Best phone found in a frame: box is (x1, y1, x2, y2) in pixels
+PhoneDetection = namedtuple("PhoneDetection", ["box", "confidence"])
+
+
+def get_model():
+    """YOLOv8 model, loaded on first use (None if it could not be loaded)."""
+    return models.get("phone")
+
+
+def _best_phone(result):
+    """Pick the most confident phone box from one YOLO result, or None."""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return None
+
+    # Tensor ops over all boxes instead of a Python loop per box
+    is_phone = boxes.cls == PHONE_CLASS_ID
+    if not bool(is_phone.any()):
+        return None
+    best = int((boxes.conf * is_phone).argmax())
+
+    x1, y1, x2, y2 = boxes.xyxy[best].tolist()
+    return PhoneDetection((int(x1), int(y1), int(x2), int(y2)), float(boxes.conf[best]))
+
+
+def detect_phones_batch(frames, conf=PHONE_CONFIDENCE):
+    """
+    Run one batched YOLO inference over several frames.
+    Returns a list with a PhoneDetection (or None) per frame.
+    """
+    if not frames:
+        return []
+    model = get_model()
+    if model is None:
+        return [None] * len(frames)
+
+    # Restricting classes lets NMS discard everything except phones
+    results = model(list(frames), conf=conf, classes=[PHONE_CLASS_ID], verbose=False)
+    return [_best_phone(r) for r in results]
 
-# Load YOLOv8 model
-try:
-    model = YOLO('yolov8n.pt')  # nano model for speed
-except Exception as e:
-    print(f"Warning: Could not load YOLO model: {e}")
-    model = None
 
 def detect_phone(frame):
     """
     Detects mobile phone using YOLOv8.
-    Returns True if phone is detected in the frame.
+    Returns a PhoneDetection if a phone is detected in the frame, else None.
     """
-    if model is None:
-        return False
-    
     try:
-        # Run inference
-        results = model(frame, conf=0.5, verbose=False)
-        
-        if results and len(results) > 0:
-            # Class 67 is "cell phone" in COCO dataset
-            # Class 77 is "laptop" 
-            # We're looking for class 67 (cell phone)
-            detections = results[0]
-            if detections.boxes is not None:
-                for box in detections.boxes:
-                    class_id = int(box.cls[0])
-                    # 67 = cell phone in COCO
-                    if class_id == 67:
-                        return True
-        
-        return False
+        return detect_phones_batch([frame])[0]
     except Exception as e:
         print(f"Error in phone detection: {e}")
-        return False
+        return None
+
+
+class PhoneBatcher:
+    """
+    Collects frames from several streams (or several sampled frames of one
+    stream) and runs them through YOLO as one batch.
+
+    A batch is dispatched when it reaches `max_batch` frames or when the
+    oldest queued frame has waited `deadline_ms`, whichever comes first.
+    submit() returns a concurrent.futures.Future resolving to a
+    PhoneDetection or None. Frames must not be modified after submit(),
+    so pass a copy if the buffer is reused (e.g. a capture ring slot).
+    """
+
+    def __init__(self, max_batch=PHONE_BATCH_SIZE, deadline_ms=PHONE_BATCH_DEADLINE_MS, conf=PHONE_CONFIDENCE):
+        self.max_batch = max_batch
+        self.deadline = deadline_ms / 1000.0
+        self.conf = conf
+        self.batches_run = 0
+        self.frames_run = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def _collect(self):
+        """Block for the first frame, then gather more until full or late."""
+        first = self._queue.get()
+        if first is None:
+            return None, True
+
+        batch = [first]
+        deadline = time.time() + self.deadline
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch, closing = self._collect()
+            if not batch:
+                continue
+
+            try:
+                detections = detect_phones_batch([frame for frame, _ in batch], self.conf)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.frames_run += len(batch)
+            for (_, future), detection in zip(batch, detections):
+                future.set_result(detection)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
@@ -1,237 +1,278 @@
-import cv2
+import argparse
+import os
 import time
-import mediapipe as mp
-from camera.camera_manager import CameraManager
+import uuid
+from camera.frame_source import open_source
 from camera.camera_stream import CameraStream
-from detectors.face_detector import detect_faces
-from detectors.head_pose_detector import is_head_straight
-from validators.face_alignment import is_face_aligned
-from detectors.eye_gaze_detector import is_eye_movement_suspicious
-from validators.face_distance import is_face_distance_valid
-from violations.violation_manager import ViolationManager
-from violations import violation_types as vt
-from timers.countdown_timer import CountdownTimer
+from camera.threaded_capture import BLOCK
+from detectors.face_detector import detect_faces, FaceTracker
+from detectors.face_pipeline import detect_faces_and_landmarks, single_face_landmarks
+from session.proctor_session import ProctorSession
 from utils.drawing import draw_text, draw_face_mesh, draw_violations
-from detectors.face_mesh_service import FaceMeshService
+from utils.detector_scheduler import DetectorScheduler
+from utils.preview import create_preview
+from utils.stage_profiler import StageProfiler, ProfileExporter
+from utils.frame_proxy import FrameProxy
+from utils.frame_packet import FramePacket
+from violations.event_log import EventLogWriter, SessionEventLog
+from violations.evidence import EvidenceRecorder
+from config.proctor_config import DEFAULT_CONFIG, ConfigWatcher
+from detectors.model_registry import models
 from config.settings import *
-from config.settings import VIOLATION_GRACE_PERIOD
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Online test proctoring")
+    parser.add_argument("--source", default=FRAME_SOURCE,
+                        help="Camera index, video file, image directory or shm:NAME")
+    parser.add_argument("--speed", type=float, default=SOURCE_SPEED,
+                        help="Playback speed of recordings (0 = as fast as possible)")
+    parser.add_argument("--start", type=float, default=0.0, help="Start this many seconds into a recording")
+    parser.add_argument("--step", type=int, default=SOURCE_STEP, help="Keep every Nth frame of a recording")
+    parser.add_argument("--preview", choices=["window", "mjpeg", "none"], default=PREVIEW_MODE,
+                        help="Where annotated frames go; 'none' runs headless")
+    parser.add_argument("--preview-file", default=PREVIEW_MJPEG_PATH,
+                        help="Output file for the mjpeg preview")
+    parser.add_argument("--preview-fps", type=float, default=PREVIEW_MJPEG_FPS,
+                        help="Frame rate of the mjpeg preview")
+    parser.add_argument("--profile", action="store_true", default=PROFILE_ENABLED,
+                        help="Time each loop stage and print p50/p95/p99 at the end")
+    parser.add_argument("--profile-out", default=PROFILE_EXPORT_PATH,
+                        help="Periodically write the profile here (.json, or .prom for Prometheus)")
+    parser.add_argument("--config", default=CONFIG_PATH,
+                        help="JSON file of policy overrides; edits apply between frames")
+    parser.add_argument("--event-log", default=EVENT_LOG_PATH,
+                        help="Append violation events to this JSONL file ('' disables)")
+    parser.add_argument("--evidence-dir", default=EVIDENCE_DIR,
+                        help="Save face keyframes around violations under this directory (off by default)")
+    return parser.parse_args()
 
 def main():
-    camera = CameraManager()
-    stream = CameraStream(camera)
-    violations = ViolationManager()
-    face_mesh = FaceMeshService.get()
-
-    test_timer = CountdownTimer(TEST_DURATION_SECONDS)
-    test_start_time = time.time()
-    
-    # Face alignment timer (5 sec) - face must be straight and at proper distance
-    face_alignment_timer = None
-    face_aligned = False
-    
-    # Grace timers for different violation types
-    no_face_timer = None
-    multiple_faces_timer = None
-    face_distance_timer = None
-    head_movement_timer = None
-    eye_movement_timer = None
-    violation_grace_timer = None  # Global grace period after ANY violation
+    started = time.perf_counter()
+    args = parse_args()
+    count_from_landmarks = FACE_COUNT_METHOD == "landmarks"
+    # Load the models while the camera opens
+    warm_up = models.warm_up(["face_mesh"] if count_from_landmarks else ["face_mesh", "face_cascade"])
+    camera = open_source(args.source, args.speed or None, step=args.step, start=args.start,
+                         fps=IMAGE_SEQUENCE_FPS)
+    stream = CameraStream(
+        camera,
+        threaded=CAPTURE_THREADED and camera.needs_capture_thread,
+        ring_size=CAPTURE_RING_SIZE,
+        # Unpaced recordings must not have frames dropped for being early
+        policy=CAPTURE_DROP_POLICY if camera.realtime else BLOCK
+    )
+    event_writer = EventLogWriter(args.event_log, EVENT_LOG_FSYNC_INTERVAL) if args.event_log else None
+    session_id = uuid.uuid4().hex[:12]
+    evidence = None
+    if args.evidence_dir:
+        evidence = EvidenceRecorder(
+            os.path.join(args.evidence_dir, session_id),
+            max_bytes=EVIDENCE_BUFFER_MB * 1024 * 1024,
+            pre_seconds=EVIDENCE_PRE_SECONDS,
+            post_seconds=EVIDENCE_POST_SECONDS,
+            sample_fps=EVIDENCE_SAMPLE_FPS
+        )
+        print(f"Saving evidence images to {evidence.out_dir}")
+    # Policy thresholds and timings, optionally from a hot-reloaded file
+    config_watcher = None
+    config = DEFAULT_CONFIG
+    if args.config:
+        config_watcher = ConfigWatcher(args.config, interval=CONFIG_RELOAD_INTERVAL)
+        config = config_watcher.config
+
+    face_tracker = FaceTracker() if FACE_TRACKING and not count_from_landmarks else None
+    profiler = StageProfiler(enabled=args.profile or args.profile_out is not None)
+    detect_face_boxes = face_tracker.detect if face_tracker is not None else detect_faces
+
+    # Each detector runs at its own rate; cached results fill the frames in between.
+    # Budgets are CPU time per second of frames, so they only mean something
+    # when frames arrive in real time; unpaced recordings stay deterministic
+    scheduler = DetectorScheduler()
+    face_budget_ms = FACE_DETECT_BUDGET_MS if camera.realtime else None
+    landmark_budget_ms = LANDMARK_BUDGET_MS if camera.realtime else None
+    if count_from_landmarks:
+        # One multi-face mesh pass gives face count, boxes and landmarks
+        scheduler.register(
+            "face_mesh",
+            lambda packet, timestamp: detect_faces_and_landmarks(
+                packet, models.get("face_mesh"), timestamp * 1000, method="landmarks", stage=profiler.stage
+            ),
+            rate_hz=LANDMARK_RATE_HZ,
+            boosted_rate_hz=LANDMARK_BOOSTED_RATE_HZ,
+            budget_ms=landmark_budget_ms
+        )
+    else:
+        def detect_face_boxes_timed(packet):
+            with profiler.stage("faces"):
+                return detect_face_boxes(packet)
+
+        scheduler.register(
+            "faces",
+            detect_face_boxes_timed,
+            rate_hz=FACE_DETECT_RATE_HZ,
+            boosted_rate_hz=FACE_DETECT_BOOSTED_RATE_HZ,
+            budget_ms=face_budget_ms
+        )
+        scheduler.register(
+            "landmarks",
+            lambda packet, timestamp: single_face_landmarks(
+                packet, models.get("face_mesh"), timestamp * 1000, face_tracker, profiler.stage
+            ),
+            rate_hz=LANDMARK_RATE_HZ,
+            boosted_rate_hz=LANDMARK_BOOSTED_RATE_HZ,
+            budget_ms=landmark_budget_ms
+        )
+
+    # Rendering runs on its own thread and never holds up detection
+    preview = create_preview(args.preview, args.preview_file, args.preview_fps)
 
+    exporter = None
+    if args.profile_out is not None:
+        exporter = ProfileExporter(profiler, args.profile_out, PROFILE_EXPORT_INTERVAL).start()
+
+    # Landmarks decide head and eye violations, so don't start without them
+    warm_up.join()
+    models.require("face_mesh")
+    print(f"Models loaded: {models.format_load_times()}")
+    # The test timer starts here, not while the models were loading
+    session = ProctorSession(
+        config=config,
+        event_log=SessionEventLog(event_writer, session_id) if event_writer is not None else None,
+        evidence=evidence
+    )
     print("Test started")
 
-    for frame in stream.frames():
+    try:
+        run_loop(stream, session, scheduler, preview, profiler,
+                 FramePacket(FrameProxy(PROXY_MAX_WIDTH)), evidence, config_watcher, started)
+    except KeyboardInterrupt:
+        print("\nInterrupted")
+    finally:
+        # Every step runs even if one fails, so the session log is never lost
+        steps = [("preview", preview.close)]
+        if exporter is not None:
+            steps.append(("profile exporter", exporter.stop))
+        steps.append(("session", lambda: session.end("quit")))
+        if evidence is not None:
+            steps.append(("evidence", evidence.close))
+        if event_writer is not None:
+            steps.append(("event log", event_writer.close))
+        steps += [("capture", stream.stop), ("camera", camera.release)]
+        shut_down(steps)
 
-        if test_timer.expired():
-            print("Test time limit reached")
+    violations = session.violations
+    print("\nTest Ended")
+    if event_writer is not None:
+        print(f"Session {session_id} logged to {args.event_log}")
+    if evidence is not None and evidence.captures_saved:
+        print(f"Evidence for {evidence.captures_saved} violations saved to {evidence.out_dir}")
+    if stream.capture is not None:
+        print(f"Frames captured: {stream.frames_captured}, dropped: {stream.frames_dropped}")
+    for name, stats in scheduler.stats().items():
+        print(f"Detector {name}: {stats['runs']} runs, {stats['skips']} cached, {stats['avg_cost_ms']} ms avg")
+    print(f"Total violations: {violations.attempts}")
+    print("Violation Details:")
+    for code, count in violations.summary().items():
+        print(f"  - {code}: {count}")
+    if profiler.enabled:
+        print("Stage latency:")
+        print(profiler.format_summary())
+
+def shut_down(steps):
+    """Runs each (name, close) teardown step, reporting failures instead of raising."""
+    for name, close in steps:
+        try:
+            close()
+        except Exception as e:
+            print(f"WARNING: Shutting down {name} failed: {e}")
+
+def report_startup(seconds):
+    """Cold start: launch to the first fully processed frame."""
+    print(f"First frame processed {seconds:.2f}s after launch")
+    if STARTUP_TARGET_SECONDS and seconds > STARTUP_TARGET_SECONDS:
+        print(f"WARNING: Startup exceeded the {STARTUP_TARGET_SECONDS}s target")
+
+def run_loop(stream, session, scheduler, preview, profiler, packet, evidence=None, config_watcher=None,
+             started=None):
+    frames = stream.frames()
+    while True:
+        with profiler.stage("capture"):
+            frame = next(frames, None)
+        if frame is None:
             break
 
-        faces = detect_faces(frame)
-
-        # Check for no face detection
-        if len(faces) == 0:
-            # No face detected - wait 1.5 seconds before counting as violation
-            if no_face_timer is None:
-                # Start 1.5-second timer before counting violation
-                no_face_timer = CountdownTimer(1.5)
-            elif no_face_timer.expired():
-                # 1.5 seconds passed without face - count violation and start grace period
-                if not violations.register(vt.NO_FACE):
-                    # Max violations exceeded - stop test
-                    print("Max violations reached - test stopped")
-                    break
-                # Start 3-second grace timer to detect face
-                no_face_timer = CountdownTimer(NO_FACE_GRACE_PERIOD)
-                print(f"No face detected - violation counted. Waiting {NO_FACE_GRACE_PERIOD}s for face...")
-            face_aligned = False
-            face_alignment_timer = None
-            # Skip all other checks when no face is detected
-            elapsed_time = time.time() - test_start_time
-            time_left = max(0, TEST_DURATION_SECONDS - elapsed_time)
-            draw_text(frame, f"Time Left: {int(time_left)}s", 40)
-            draw_text(frame, f"Violations: {violations.attempts}/{MAX_VIOLATIONS}", 80)
-            draw_violations(frame, violations.get_active_violations())
-            cv2.imshow("Online Test Proctoring", frame)
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
-            continue
-        else:
-            # Face detected - reset grace period timer
-            if no_face_timer is not None:
-                print("Face detected - timer reset")
-            no_face_timer = None
-
-        # Check for multiple faces
-        if len(faces) > 1:
-            # Multiple faces detected - wait 1.5 seconds before counting as violation
-            if multiple_faces_timer is None:
-                # Start 1.5-second timer before counting violation
-                multiple_faces_timer = CountdownTimer(1)
-            elif multiple_faces_timer.expired():
-                # 1.5 seconds passed with multiple faces - count violation and start grace period
-                if not violations.register(vt.MULTIPLE_FACES):
-                    # Max violations exceeded - stop test
-                    print("Max violations reached - test stopped")
-                    break
-                # Start 3-second grace timer for faces to go back to 1
-                multiple_faces_timer = CountdownTimer(NO_FACE_GRACE_PERIOD)
-                print(f"Multiple faces detected - violation counted. Waiting {NO_FACE_GRACE_PERIOD}s...")
-            face_aligned = False
-            face_alignment_timer = None
-            # Skip all other checks when multiple faces detected
-            elapsed_time = time.time() - test_start_time
-            time_left = max(0, TEST_DURATION_SECONDS - elapsed_time)
-            draw_text(frame, f"Time Left: {int(time_left)}s", 40)
-            draw_text(frame, f"Violations: {violations.attempts}/{MAX_VIOLATIONS}", 80)
-            draw_violations(frame, violations.get_active_violations())
-            cv2.imshow("Online Test Proctoring", frame)
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
-            continue
+        now = stream.last_timestamp
+
+        if config_watcher is not None:
+            config, changed = config_watcher.poll()
+            if changed:
+                print(f"Config reloaded: {', '.join(config.changes(session.config))}")
+                session.set_config(config)
+
+        # Detectors share one packet: the downscaled proxy and its gray/RGB
+        # views are each computed at most once; the full frame is only drawn on
+        packet.load(frame, now)
+        with profiler.stage("resize"):
+            packet.small  # Computed here so resizing is timed on its own
+        # Sample faster while a violation is pending, so it is confirmed or
+        # cleared on time: face count and size come from the face detector,
+        # head and eye movement from the landmarks
+        face_timer_armed = (session.no_face_timer is not None or session.multiple_faces_timer is not None
+                            or session.face_distance_timer is not None)
+        movement_timer_armed = session.head_movement_timer is not None or session.eye_movement_timer is not None
+
+        if "face_mesh" in scheduler.detectors:
+            scheduler.boost("face_mesh", face_timer_armed or movement_timer_armed)
+            boxes, face_landmarks = scheduler.run("face_mesh", packet, now, now=now)
+            faces = packet.to_full_boxes(boxes)
         else:
-            # Face count is 1 - reset multiple faces timer
-            if multiple_faces_timer is not None:
-                print("Multiple faces resolved - timer reset")
-            multiple_faces_timer = None
-
-        # Process single face
-        if len(faces) == 1:
-            # ---- Face mesh detection (MUST happen first) ----
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
-            face_landmarks_result = face_mesh.detect(mp_image)
-
-            if not face_landmarks_result.face_landmarks:
-                face_aligned = False
-                head_movement_timer = None
-                eye_movement_timer = None
-                continue
-
-            face_landmarks = face_landmarks_result.face_landmarks[0]
-
-            face = faces[0]
-            
-            # Check face distance (too close or too far)
-            if not is_face_distance_valid(face, frame.shape):
-                # Distance invalid (too close or too far)
-                if face_distance_timer is None:
-                    # Start 1-second timer before counting violation
-                    face_distance_timer = CountdownTimer(1)
-
-                elif face_distance_timer.expired():
-                    # Invalid distance persisted for 1 second → violation
-                    if not violations.register(vt.FACE_DISTANCE):
-                        print("Max violations reached - test stopped")
-                        break
-
-                    # Start grace period after violation
-                    violation_grace_timer = CountdownTimer(VIOLATION_GRACE_PERIOD)
-                    # Reset timer after counting violation
-                    face_distance_timer = None
-                    print("Face distance violation counted")
-                face_aligned = False
-                face_alignment_timer = None
+            scheduler.boost("faces", face_timer_armed)
+            faces = packet.to_full_boxes(scheduler.run("faces", packet, now=now))
+            face_landmarks = None
+
+            # Process single face
+            if len(faces) == 1:
+                scheduler.boost("landmarks", movement_timer_armed)
+                face_landmarks = scheduler.run("landmarks", packet, now, now=now)
             else:
-                # Distance back to valid → reset timer
-                if face_distance_timer is not None:
-                    print("Face distance valid - timer reset")
-                face_distance_timer = None
-
-                # Check if we're in violation grace period (skip other violation checks)
-                if violation_grace_timer is not None and not violation_grace_timer.expired():
-                    # Still in grace period - skip other violation checks
-                    pass
-                else:
-                    # Grace period ended or doesn't exist
-                    violation_grace_timer = None
-                    
-                    # Head alignment check
-                    face_aligned = is_face_aligned(face_landmarks)
-
-                    if not face_aligned:
-                        if head_movement_timer is None:
-                            head_movement_timer = CountdownTimer(HEAD_MOVEMENT_GRACE_PERIOD)
-
-                        elif head_movement_timer.expired():
-                            if not violations.register(vt.HEAD_MOVEMENT):
-                                print("Max violations reached - test stopped")
-                                break
-
-                            # Start grace period after violation
-                            violation_grace_timer = CountdownTimer(VIOLATION_GRACE_PERIOD)
-                            print("Head movement violation counted")
-                            head_movement_timer = None
-
-                        # Do NOT evaluate eyes when head is not aligned
-                        eye_movement_timer = None
-
-                    else:
-                        # Head is straight again
-                        if head_movement_timer is not None:
-                            print("Head straight - timer reset")
-                        head_movement_timer = None
-
-                        # # Eye movement check (ONLY when head is straight)
-                        # if is_eye_movement_suspicious(frame):
-                        #     if eye_movement_timer is None:
-                        #         eye_movement_timer = CountdownTimer(EYE_MOVEMENT_GRACE_PERIOD)
-
-                        #     elif eye_movement_timer.expired():
-                        #         if not violations.register(vt.EYE_MOVEMENT):
-                        #             break
-                        #         # Start grace period after violation
-                        #         violation_grace_timer = CountdownTimer(VIOLATION_GRACE_PERIOD)
-                        # else:
-                        #     eye_movement_timer = None
-
-        elapsed_time = time.time() - test_start_time
-        time_left = max(0, TEST_DURATION_SECONDS - elapsed_time)
-        
-        draw_text(frame, f"Time Left: {int(time_left)}s", 40)
-        draw_text(frame, f"Violations: {violations.attempts}/{MAX_VIOLATIONS}", 80)
-        draw_violations(frame, violations.get_active_violations())
-        
-        if face_alignment_timer is not None and not face_aligned:
-            alignment_time_left = max(0, FACE_ALIGNMENT_GRACE_PERIOD - (time.time() - face_alignment_timer.start_time))
-            draw_text(frame, f"Align face: {int(alignment_time_left)}s", 120)
-        
-        # Draw face mesh landmarks (only if available)
-        if len(faces) == 1:
-            try:
-                draw_face_mesh(frame, [face_landmarks])
-            except:
-                pass
-
-        cv2.imshow("Online Test Proctoring", frame)
-        if cv2.waitKey(1) & 0xFF == ord("q"):
+                # Landmarks from another face count must not be reused
+                scheduler.invalidate("landmarks")
+
+        if evidence is not None:
+            # Before session.update, so the frame that triggers a violation is kept
+            with profiler.stage("evidence"):
+                evidence.add_frame(frame, now)
+
+        with profiler.stage("session"):
+            observation = session.observe(faces, face_landmarks, frame.shape, now)
+            decision = session.update(observation, stream.last_timestamp)
+        profiler.frame_done()
+        if started is not None:
+            report_startup(time.perf_counter() - started)
+            started = None
+        if decision.stop:
+            break
+
+        if preview.quit_requested:
             break
+        if not preview.wants_frame():
+            continue
 
-    camera.release()
+        with profiler.stage("draw"):
+            violations = session.violations
+            draw_text(frame, f"Time Left: {int(session.time_left())}s", 40)
+            draw_text(frame, f"Violations: {violations.attempts}/{session.config.max_violations}", 80)
+            draw_violations(frame, violations.get_active_violations())
 
-    print("\nTest Ended")
-    print(f"Total violations: {violations.attempts}")
-    print("Violation Details:")
-    for v in violations.records:
-        print(f"  - {v}")
+            # Draw face mesh landmarks (only if available)
+            if face_landmarks is not None:
+                try:
+                    draw_face_mesh(frame, [face_landmarks])
+                except:
+                    pass
+
+        with profiler.stage("preview"):
+            preview.submit(frame)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,209 @@
+"""
+Headless batch engine: runs the proctoring violation logic over recorded
+exam videos, one video per worker process.
+
+Usage:
+    python -m offline.batch_engine <video or directory> [...] --workers 8 --out reports/
+    python -m offline.batch_engine recordings/ --record cache/   # also cache detector outputs
+    python -m offline.batch_engine recordings/ --step 3          # every 3rd frame, for a quick pass
+"""
+import argparse
+import json
+import os
+import time
+from functools import partial
+import multiprocessing as mp_proc
+import cv2
+from camera.frame_source import VideoFileSource
+from detectors.face_detector import FaceTracker
+from detectors.face_mesh_service import FaceMeshService
+from detectors.face_pipeline import detect_faces_and_landmarks
+from utils.frame_proxy import FrameProxy
+from utils.frame_packet import FramePacket
+from offline.detector_cache import DetectorCacheWriter
+from config.settings import PROXY_MAX_WIDTH
+from session.proctor_session import ObservationFilter, replay
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+
+def _init_worker():
+    # One process per core; keep OpenCV from oversubscribing with its own threads
+    cv2.setNumThreads(1)
+
+
+def find_videos(paths):
+    """Expand files and directories into a list of video paths."""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(VIDEO_EXTENSIONS):
+                        videos.append(os.path.join(root, name))
+        else:
+            videos.append(path)
+    return videos
+
+
+def report_names(videos):
+    """
+    {video: name} with each video's path relative to the deepest directory
+    all of them share, so same-named videos in different directories get
+    different output files.
+    """
+    if not videos:
+        return {}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in videos])
+    return {path: os.path.relpath(os.path.abspath(path), root) for path in videos}
+
+
+def detect_video(path, face_mesh, step=1):
+    """
+    Decode a video as fast as possible and run the detectors on every
+    `step`th frame (skipped frames are not decoded). Yields
+    (timestamp_s, faces, face_landmarks, frame_shape) per frame.
+    """
+    source = VideoFileSource(path, speed=None, step=step, epoch=0.0)
+    tracker = FaceTracker()
+    packet = FramePacket(FrameProxy(PROXY_MAX_WIDTH))
+    frame = None
+
+    try:
+        while True:
+            frame = source.read_frame_into(frame)
+            if frame is None:
+                break
+            timestamp = source.last_timestamp
+
+            # Nothing is displayed, so the whole check runs on the proxy;
+            # the face/frame area ratio doesn't depend on resolution
+            packet.load(frame, timestamp)
+            faces, face_landmarks = detect_faces_and_landmarks(packet, face_mesh, timestamp * 1000, tracker)
+            yield timestamp, faces, face_landmarks, packet.shape
+    finally:
+        source.release()
+
+
+def observe_video(path, face_mesh, cache=None, step=1):
+    """
+    Yield (timestamp_s, FrameObservation) per frame of a video, recording
+    the raw detector outputs to `cache` (a DetectorCacheWriter) if given.
+    """
+    # Same smoothing as a live session
+    observation_filter = ObservationFilter()
+    for timestamp, faces, face_landmarks, frame_shape in detect_video(path, face_mesh, step):
+        if cache is not None:
+            cache.append(timestamp, faces, face_landmarks, frame_shape)
+        yield timestamp, observation_filter.observe(faces, face_landmarks, frame_shape, timestamp)
+
+
+def _drain(observations):
+    # Keep consuming after a stop so the cache covers the whole video
+    for _ in observations:
+        pass
+
+
+def analyse_video(path, cache_root=None, step=1, name=None):
+    """
+    Worker entry point: returns the violation report for one video. Its
+    detector cache goes to `cache_root`/`name` (default: the file name).
+    """
+    start = time.time()
+    cache = None
+    face_mesh = None
+    try:
+        # VIDEO mode tracks faces across frames and needs increasing
+        # timestamps, so every video gets a fresh landmarker
+        face_mesh = FaceMeshService("VIDEO")
+        if cache_root:
+            cache = DetectorCacheWriter(os.path.join(cache_root, name or os.path.basename(path)), source=path)
+        observations = observe_video(path, face_mesh, cache, step)
+        session, timeline = replay(observations)
+        if cache is not None:
+            _drain(observations)
+            cache.close()
+    except Exception as e:
+        return {"video": path, "error": str(e)}
+    finally:
+        if face_mesh is not None:
+            face_mesh.close()
+
+    violations = [{"type": v, "time": round(t, 3)} for t, v in timeline]
+    frames = session.frames_processed if session is not None else 0
+    terminated = session is not None and session.stopped
+
+    elapsed = time.time() - start
+    return {
+        "video": path,
+        "frames": frames,
+        "processing_seconds": round(elapsed, 3),
+        "frames_per_second": round(frames / elapsed, 1) if elapsed > 0 else None,
+        "total_violations": len(violations),
+        "terminated_early": terminated,
+        "violations": violations,
+    }
+
+
+def _analyse_job(job, cache_root=None, step=1):
+    path, name = job
+    return analyse_video(path, cache_root, step, name)
+
+
+def run_batch(paths, workers=None, out_dir=None, cache_root=None, step=1):
+    """
+    Analyse every video under `paths` across a process pool.
+    Yields reports as videos finish; writes <video>.violations.json files
+    to `out_dir` when given (in the videos' relative directories), and
+    detector caches under the same relative names in `cache_root`.
+    """
+    videos = find_videos(paths)
+    names = report_names(videos)
+    # Longest videos first so the pool doesn't end on one straggler
+    videos.sort(key=lambda p: os.path.getsize(p) if os.path.exists(p) else 0, reverse=True)
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    with mp_proc.Pool(processes=workers, initializer=_init_worker) as pool:
+        analyse = partial(_analyse_job, cache_root=cache_root, step=step)
+        jobs = [(path, names[path]) for path in videos]
+        for report in pool.imap_unordered(analyse, jobs, chunksize=1):
+            if out_dir:
+                report_path = os.path.join(out_dir, names[report["video"]] + ".violations.json")
+                os.makedirs(os.path.dirname(report_path), exist_ok=True)
+                with open(report_path, "w") as f:
+                    json.dump(report, f, indent=2)
+            yield report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run proctoring checks over recorded videos")
+    parser.add_argument("paths", nargs="+", help="Video files or directories")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--out", default=None, help="Directory for per-video JSON reports")
+    parser.add_argument("--record", default=None,
+                        help="Directory for per-video detector caches (for offline.threshold_sweep)")
+    parser.add_argument("--step", type=int, default=1, help="Analyse every Nth frame")
+    args = parser.parse_args()
+
+    start = time.time()
+    total_frames = 0
+    for report in run_batch(args.paths, args.workers, args.out, args.record, args.step):
+        if "error" in report:
+            print(f"[ERROR] {report['video']}: {report['error']}")
+            continue
+        total_frames += report["frames"]
+        print(f"{report['video']}: {report['total_violations']} violations "
+              f"({report['frames']} frames, {report['frames_per_second']} fps)")
+        for v in report["violations"]:
+            print(f"  - {v['time']:>9.2f}s  {v['type']}")
+
+    elapsed = time.time() - start
+    print(f"\nProcessed {total_frames} frames in {elapsed:.1f}s "
+          f"({total_frames / elapsed if elapsed > 0 else 0:.1f} fps overall)")
+
+
+if __name__ == "__main__":
+    main()
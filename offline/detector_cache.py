@@ -0,0 +1,223 @@
+"""
+Columnar on-disk cache of raw per-frame detector outputs.
+
+One directory per recorded session, one flat binary file per column plus
+meta.json describing dtypes and shapes:
+
+    t.bin           float64  (N,)         frame timestamp in seconds
+    face_count.bin  int16    (N,)         faces found (cascade or landmarker, see meta "face_count_method")
+    box.bin         int32    (N, 4)       first face box (x, y, w, h)
+    landmarks.bin   float32  (N, 478, 3)  landmarks, NaN when not run / none found
+
+Columns are appended while the video is analysed and read back as NumPy
+memmaps, so the violation logic can be re-run under other thresholds
+without touching the video or the models (see offline/threshold_sweep.py).
+meta.json is written last and marks the cache as complete.
+"""
+import json
+import os
+import numpy as np
+from detectors.landmarks import NUM_LANDMARKS
+from detectors.head_pose_detector import head_pose_ratios_batch, estimate_head_pose
+from detectors.eye_gaze_detector import estimate_gaze_batch
+from utils.smoothing import OneEuroFilter, EmaFilter
+from config.settings import FACE_COUNT_METHOD
+
+CACHE_VERSION = 1
+
+COLUMNS = {
+    "t": (np.float64, ()),
+    "face_count": (np.int16, ()),
+    "box": (np.int32, (4,)),
+    "landmarks": (np.float32, (NUM_LANDMARKS, 3)),
+}
+
+# Rows buffered in memory before each write
+CHUNK_ROWS = 256
+
+# Frames per slice when deriving features, bounds memory on long sessions
+FEATURE_CHUNK = 65536
+# Smoothed landmarks are float64, so they are sliced finer
+SMOOTHED_CHUNK = 1024
+
+
+class DetectorCacheWriter:
+    def __init__(self, directory, source=None):
+        self.directory = directory
+        self.source = source
+        self.frames = 0
+        self.frame_shape = None
+        os.makedirs(directory, exist_ok=True)
+
+        # Drop any earlier (possibly incomplete) cache in this directory
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        self._files = {name: open(os.path.join(directory, f"{name}.bin"), "wb") for name in COLUMNS}
+        self._rows = {name: [] for name in COLUMNS}
+
+    def append(self, timestamp, faces, face_landmarks, frame_shape):
+        """Add one frame's detector outputs (boxes in frame_shape pixels)."""
+        if self.frame_shape is None:
+            self.frame_shape = tuple(int(v) for v in frame_shape[:2])
+
+        box = faces[0] if len(faces) > 0 else (0, 0, 0, 0)
+        if face_landmarks is None:
+            landmarks = np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        else:
+            landmarks = np.asarray(face_landmarks, dtype=np.float32)[:NUM_LANDMARKS]
+
+        self._rows["t"].append(timestamp)
+        self._rows["face_count"].append(len(faces))
+        self._rows["box"].append(box)
+        self._rows["landmarks"].append(landmarks)
+        self.frames += 1
+
+        if len(self._rows["t"]) >= CHUNK_ROWS:
+            self._flush()
+
+    def _flush(self):
+        for name, (dtype, shape) in COLUMNS.items():
+            rows = self._rows[name]
+            if rows:
+                np.asarray(rows, dtype=dtype).reshape((-1,) + shape).tofile(self._files[name])
+            self._rows[name] = []
+
+    def close(self):
+        self._flush()
+        for f in self._files.values():
+            f.close()
+
+        meta = {
+            "version": CACHE_VERSION,
+            "frames": self.frames,
+            "frame_shape": self.frame_shape,
+            "source": self.source,
+            "face_count_method": FACE_COUNT_METHOD,
+            "columns": {
+                name: {"dtype": np.dtype(dtype).str, "shape": list(shape)}
+                for name, (dtype, shape) in COLUMNS.items()
+            },
+        }
+        with open(os.path.join(self.directory, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+
+class DetectorCache:
+    """Read-only view of a cache directory; columns are memmapped on access."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != CACHE_VERSION:
+            raise ValueError(f"Unsupported detector cache version in {directory}")
+        self.frames = self.meta["frames"]
+        self.frame_shape = self.meta["frame_shape"]
+        self._columns = {}
+
+    def __len__(self):
+        return self.frames
+
+    def column(self, name):
+        if name not in self._columns:
+            spec = self.meta["columns"][name]
+            shape = (self.frames,) + tuple(spec["shape"])
+            if self.frames == 0:
+                self._columns[name] = np.empty(shape, dtype=spec["dtype"])
+            else:
+                self._columns[name] = np.memmap(
+                    os.path.join(self.directory, f"{name}.bin"),
+                    dtype=spec["dtype"], mode="r", shape=shape
+                )
+        return self._columns[name]
+
+    def features(self, pnp=False):
+        """
+        Threshold-independent per-frame features, as arrays of length N:
+        t, face_count, has_landmarks, area_ratio, yaw, pitch, gaze_h, gaze_v,
+        plus yaw_degrees and pitch_degrees (solvePnP, NaN where it fails)
+        if `pnp`.
+        """
+        h, w = self.frame_shape if self.frame_shape else (1, 1)
+        box = self.column("box")
+        landmarks = self.column("landmarks")
+
+        features = self._empty_features(pnp)
+        for start in range(0, self.frames, FEATURE_CHUNK):
+            chunk = np.asarray(landmarks[start:start + FEATURE_CHUNK])
+            self._landmark_features(features, start, chunk)
+
+        features.update(
+            has_landmarks=~np.isnan(landmarks[:, 0, 0]),
+            area_ratio=box[:, 2].astype(np.float64) * box[:, 3] / (w * h),
+        )
+        return features
+
+    def smoothed_features(self, min_cutoff, beta, box_smoothing_seconds, pnp=False):
+        """
+        features() of the landmarks and boxes after the smoothing
+        ObservationFilter applies live, with its state reset wherever there
+        isn't exactly one face with landmarks. Runs the filters frame by
+        frame, so derive it once per smoothing setting, not per threshold.
+        """
+        h, w = self.frame_shape if self.frame_shape else (1, 1)
+        t = np.asarray(self.column("t"))
+        box = self.column("box")
+        landmarks = self.column("landmarks")
+        single = (np.asarray(self.column("face_count")) == 1) & ~np.isnan(landmarks[:, 0, 0])
+
+        features = self._empty_features(pnp)
+        area_ratio = np.full(self.frames, np.nan)
+        landmark_filter = OneEuroFilter()
+        box_filter = EmaFilter()
+        smoothed = np.empty((min(SMOOTHED_CHUNK, self.frames), NUM_LANDMARKS, 3))
+        for start in range(0, self.frames, SMOOTHED_CHUNK):
+            chunk = smoothed[:min(SMOOTHED_CHUNK, self.frames - start)]
+            for offset in range(len(chunk)):
+                i = start + offset
+                if not single[i]:
+                    landmark_filter.reset()
+                    box_filter.reset()
+                    chunk[offset] = np.nan
+                    continue
+                chunk[offset] = landmark_filter.update(landmarks[i], t[i], min_cutoff, beta)
+                _, _, box_w, box_h = box_filter.update(box[i], t[i], box_smoothing_seconds)
+                area_ratio[i] = box_w * box_h / (w * h)
+            self._landmark_features(features, start, chunk)
+
+        features.update(has_landmarks=single, area_ratio=area_ratio)
+        return features
+
+    def _empty_features(self, pnp):
+        features = {
+            "t": np.asarray(self.column("t")),
+            "face_count": np.asarray(self.column("face_count")),
+        }
+        names = ["yaw", "pitch", "gaze_h", "gaze_v"] + (["yaw_degrees", "pitch_degrees"] if pnp else [])
+        for name in names:
+            features[name] = np.empty(self.frames)
+        return features
+
+    def _landmark_features(self, features, start, chunk):
+        """Fill the landmark-derived features for frames start.. from a slice of landmarks."""
+        end = start + len(chunk)
+        features["yaw"][start:end], features["pitch"][start:end] = head_pose_ratios_batch(chunk)
+        features["gaze_h"][start:end], features["gaze_v"][start:end] = estimate_gaze_batch(chunk)
+        if "yaw_degrees" not in features:
+            return
+        for offset, points in enumerate(chunk):
+            pose = None if np.isnan(points[0, 0]) else estimate_head_pose(points, self.frame_shape)
+            yaw, pitch = (np.nan, np.nan) if pose is None else pose[:2]
+            features["yaw_degrees"][start + offset] = yaw
+            features["pitch_degrees"][start + offset] = pitch
+
+
+def find_caches(paths):
+    """Cache directories (those with a meta.json) under the given paths."""
+    caches = []
+    for path in paths:
+        for root, _, files in os.walk(path):
+            if "meta.json" in files:
+                caches.append(root)
+    return sorted(caches)
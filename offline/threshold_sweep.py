@@ -0,0 +1,245 @@
+"""
+Re-run the violation logic over cached detector outputs under many
+threshold / timing combinations in parallel, without video or inference.
+
+Record caches first with:
+    python -m offline.batch_engine recordings/ --record cache/
+
+Then sweep:
+    python -m offline.threshold_sweep cache/ \\
+        --param HEAD_YAW_THRESHOLD=0.08,0.10,0.12 \\
+        --param VIOLATION_GRACE_PERIOD=2,3 --workers 8 --out sweep.json
+
+Sweepable parameters are the ProctorConfig fields in PARAMETERS (given in
+upper case, like their config/settings.py defaults); any not given keep
+their default value.
+
+Observations for a whole session come from one set of array operations
+per combination, giving exactly what the live and batch pipelines see.
+With SMOOTHING on, the cached landmarks and boxes are first run through
+the live filters frame by frame; that costs about as much as a replay
+but is done once per cache and smoothing setting (LANDMARK_MIN_CUTOFF,
+LANDMARK_BETA, BOX_SMOOTHING_SECONDS), not per threshold combination.
+HEAD_POSE_METHOD=pnp likewise solves every frame's pose once per cache.
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+import multiprocessing as mp_proc
+from collections import Counter, OrderedDict
+import numpy as np
+from offline.detector_cache import DetectorCache, find_caches
+from session.proctor_session import FrameObservation, replay
+from config.proctor_config import DEFAULT_CONFIG, FIELDS
+
+# Every scalar policy field; sweeps replay without a time limit
+NOT_SWEPT = {"test_duration_seconds", "max_violations_per_type"}
+PARAMETERS = [name.upper() for name in FIELDS if name not in NOT_SWEPT]
+
+# Per-process LRU of derived features, keyed by cache directory and the
+# settings they depend on; a worker mostly sweeps one cache at a time
+FEATURES_KEPT = 4
+_features = OrderedDict()
+
+
+def load_features(cache_dir, config):
+    """Features for one cache as `config` needs them, from the per-process LRU."""
+    pnp = config.head_pose_method == "pnp"
+    if config.smoothing:
+        key = (cache_dir, pnp, config.landmark_min_cutoff, config.landmark_beta, config.box_smoothing_seconds)
+    else:
+        key = (cache_dir, pnp)
+
+    features = _features.get(key)
+    if features is None:
+        cache = DetectorCache(cache_dir)
+        if config.smoothing:
+            features = cache.smoothed_features(*key[2:], pnp=pnp)
+        else:
+            features = cache.features(pnp=pnp)
+        _features[key] = features
+        while len(_features) > FEATURES_KEPT:
+            _features.popitem(last=False)
+    else:
+        _features.move_to_end(key)
+    return features
+
+
+def hysteresis(inside_wide, inside_narrow, single):
+    """
+    Hysteresis.update() over every frame at once. The state restarts
+    inside at the first frame of each run of `single` frames, as
+    ObservationFilter resets it.
+    """
+    run_start = single & ~np.concatenate(([False], single[:-1]))
+    # Frames that decide the state; the others keep the last decided one
+    decided = inside_narrow | ~inside_wide | ~single | run_start
+    state = np.where(run_start, inside_wide, inside_narrow)
+    last = np.where(decided, np.arange(len(single)), 0)
+    np.maximum.accumulate(last, out=last)
+    return state[last]
+
+
+def build_observations(features, config):
+    """
+    Vectorized equivalent of observe_frame() (or, on smoothed features,
+    ObservationFilter.observe()) for every cached frame.
+    Returns (timestamps, list of FrameObservation).
+    """
+    single = (features["face_count"] == 1) & features["has_landmarks"]
+    margin = config.hysteresis_margin if config.smoothing else 0.0
+
+    if config.head_pose_method == "pnp":
+        yaw, pitch = features["yaw_degrees"], features["pitch_degrees"]
+        yaw_limit, pitch_limit = config.head_yaw_degrees, config.head_pitch_degrees
+    else:
+        yaw, pitch = features["yaw"], features["pitch"]
+        yaw_limit, pitch_limit = config.head_yaw_threshold, config.head_pitch_threshold
+
+    ratio = features["area_ratio"]
+    low, high = config.face_min_area_ratio, config.face_max_area_ratio
+
+    with np.errstate(invalid="ignore"):
+        def pose_within(scale):
+            return (np.abs(yaw) <= yaw_limit * scale) & (np.abs(pitch) <= pitch_limit * scale)
+
+        def ratio_in_range(inset_margin):
+            inset = (high - low) * inset_margin / 2
+            return (ratio >= low + inset) & (ratio <= high - inset)
+
+        if config.smoothing:
+            aligned = single & hysteresis(pose_within(1 + margin), pose_within(1 - margin), single)
+            distance_valid = single & hysteresis(ratio_in_range(-margin), ratio_in_range(margin), single)
+        else:
+            aligned = single & pose_within(1.0)
+            distance_valid = single & ratio_in_range(0.0)
+
+        # NaN gaze (eyes closed) compares False, i.e. not suspicious
+        gaze = aligned & config.eye_movement_check & (
+            (np.abs(features["gaze_h"]) > config.eye_movement_threshold) |
+            (np.abs(features["gaze_v"]) > config.eye_vertical_threshold)
+        )
+
+    observations = [
+        FrameObservation(int(count), bool(s), bool(d), bool(a), bool(g))
+        for count, s, d, a, g in zip(features["face_count"], single, distance_valid, aligned, gaze)
+    ]
+    return features["t"], observations
+
+
+def evaluate(cache_dir, config):
+    """Violation counts for one cached session under one ProctorConfig."""
+    timestamps, observations = build_observations(load_features(cache_dir, config), config)
+    timestamps = timestamps.tolist()
+
+    session, timeline = replay(zip(timestamps, observations), config=config)
+
+    return {
+        "violations": Counter(v for _, v in timeline),
+        "terminated_early": session is not None and session.stopped,
+    }
+
+
+def _evaluate_task(task):
+    index, cache_dir, config = task
+    return index, cache_dir, evaluate(cache_dir, config)
+
+
+def parse_param(text):
+    """'NAME=v1,v2,...' -> (NAME, [values])"""
+    name, _, values = text.partition("=")
+    name = name.strip().upper()
+    if name not in PARAMETERS:
+        raise argparse.ArgumentTypeError(f"Unknown parameter {name}; choose from {', '.join(PARAMETERS)}")
+    parsed = []
+    for value in values.split(","):
+        value = value.strip()
+        if value.lower() in ("true", "false"):
+            parsed.append(value.lower() == "true")
+        else:
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                parsed.append(value)  # e.g. HEAD_POSE_METHOD=ratio,pnp
+    if not parsed:
+        raise argparse.ArgumentTypeError(f"No values given for {name}")
+    return name, parsed
+
+
+def parameter_grid(swept):
+    """(swept values, ProctorConfig) for every combination over the defaults."""
+    names = [name for name, _ in swept]
+    for values in itertools.product(*(values for _, values in swept)):
+        params = dict(zip(names, values))
+        yield params, DEFAULT_CONFIG.replace(**params)
+
+
+def run_sweep(cache_dirs, swept, workers=None):
+    """
+    Evaluate every parameter combination on every cache. Returns one result
+    per combination with violation totals across all sessions.
+    """
+    grid = list(parameter_grid(swept))
+    results = [
+        {"params": params, "violations": Counter(), "sessions_terminated": 0}
+        for params, _ in grid
+    ]
+    # Cache-major order, so a worker mostly reuses the features it already derived
+    tasks = [
+        (index, cache_dir, config)
+        for cache_dir in cache_dirs
+        for index, (_, config) in enumerate(grid)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    with mp_proc.Pool(processes=workers) as pool:
+        chunksize = max(1, len(grid) // workers)
+        for index, _, outcome in pool.imap_unordered(_evaluate_task, tasks, chunksize=chunksize):
+            results[index]["violations"].update(outcome["violations"])
+            results[index]["sessions_terminated"] += outcome["terminated_early"]
+
+    for result in results:
+        result["total_violations"] = sum(result["violations"].values())
+        result["violations"] = dict(result["violations"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep violation thresholds over cached detector outputs")
+    parser.add_argument("paths", nargs="+", help="Cache directories (or directories containing them)")
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="NAME=v1,v2,... (repeatable)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--out", default=None, help="Write all results as JSON")
+    args = parser.parse_args()
+
+    caches = find_caches(args.paths)
+    if not caches:
+        parser.error("No detector caches found (record them with offline.batch_engine --record)")
+
+    start = time.time()
+    try:
+        results = run_sweep(caches, args.param, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.time() - start
+
+    swept_names = [name for name, _ in args.param]
+    for result in sorted(results, key=lambda r: r["total_violations"]):
+        label = ", ".join(f"{name}={result['params'][name]}" for name in swept_names) or "defaults"
+        print(f"{label}: {result['total_violations']} violations, "
+              f"{result['sessions_terminated']} sessions terminated")
+        for violation, count in sorted(result["violations"].items()):
+            print(f"  - {violation}: {count}")
+
+    print(f"\nEvaluated {len(results)} combinations over {len(caches)} sessions in {elapsed:.1f}s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"caches": caches, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Multi-candidate proctoring server: one asyncio process holds the session
+state for many candidates and runs inference on a shared worker pool.
+
+Wire protocol (TCP, all integers big-endian):
+    client -> server  hello:  uint32 length + UTF-8 JSON {"session_id": "...",
+                              "policy": {...optional ProctorConfig overrides}}
+    client -> server  frame:  float64 capture timestamp + uint32 length + JPEG bytes
+    server -> client  reply:  one JSON line per processed frame
+                              {"seq": n, "violations": [...], "stop": bool, "reason": ...}
+                              and, with phone checks on, one per frame a phone was seen in
+                              {"timestamp": t, "phone": {"box": [x1, y1, x2, y2], "confidence": c}}
+
+Phone checks (--phone-rate) sample each candidate's frames and run them
+through one PhoneBatcher, so frames from all candidates share batched
+YOLO calls.
+
+Usage:
+    python -m server.proctor_server --port 8765 --workers 4
+    python -m server.proctor_server --videos recordings/   # simulated clients
+    python -m server.proctor_server --phone-rate 2         # also check for phones, 2 frames/s per candidate
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import time
+import multiprocessing as mp_proc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from session.proctor_session import ProctorSession
+from violations.event_log import EventLogWriter, SessionEventLog
+from config.proctor_config import DEFAULT_CONFIG
+from config.settings import PHONE_CHECK_RATE_HZ
+
+HELLO_HEADER = struct.Struct(">I")
+FRAME_HEADER = struct.Struct(">dI")
+
+# Summaries of disconnected candidates kept in memory; the event log has all of them
+FINISHED_KEPT = 1000
+
+# Per-worker state, created once by _init_worker
+_face_mesh = None
+
+
+def _init_worker():
+    global _face_mesh
+    from detectors.face_mesh_service import FaceMeshService
+
+    cv2.setNumThreads(1)
+    # Frames from different candidates interleave on a worker, so the
+    # landmarker must not carry temporal state between calls
+    _face_mesh = FaceMeshService("IMAGE")
+
+
+def _ping(_):
+    return os.getpid()
+
+
+def analyse_frame(jpeg_bytes):
+    """
+    Worker entry point: decode one frame and return its raw detector outputs
+    (faces, face_landmarks, frame_shape). Turning them into an observation
+    needs the candidate's filter state, so that happens in the server.
+    """
+    from detectors.face_pipeline import detect_faces_and_landmarks
+    from utils.frame_packet import FramePacket
+
+    frame = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+
+    packet = FramePacket().load(frame)
+    faces, face_landmarks = detect_faces_and_landmarks(packet, _face_mesh)
+    return faces, face_landmarks, frame.shape
+
+
+class CandidateConnection:
+    """
+    State for one connected candidate. Frames are processed one at a time
+    per candidate; if inference falls behind, only the newest pending frame
+    is kept so decisions are never made on stale video.
+
+    The session runs on the client's frame timestamps and starts at the
+    first frame taken for processing, as replay() does, so the server's
+    own clock (and any skew against the client's) never enters into it.
+    """
+
+    def __init__(self, session_id, event_writer=None, config=DEFAULT_CONFIG):
+        self.session_id = session_id
+        self.event_log = SessionEventLog(event_writer, session_id) if event_writer is not None else None
+        self.config = config
+        self.session = None  # Started by session_at() on the first frame
+        self.now = None      # Client timestamp of the frame being processed
+        self.pending = None  # (timestamp, jpeg) waiting for the worker pool
+        self.frame_ready = asyncio.Event()
+        self.closed = False
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.last_phone_check = None
+        self.phone_checks = set()  # Pending phone check tasks
+        self.phone_frames = 0
+
+    @property
+    def stopped(self):
+        return self.session is not None and self.session.stopped
+
+    def session_at(self, timestamp):
+        """The candidate's session, with its clock moved to `timestamp`."""
+        self.now = timestamp
+        if self.session is None:
+            self.session = ProctorSession(
+                clock=lambda: self.now, verbose=False, event_log=self.event_log, config=self.config
+            )
+        return self.session
+
+    def push(self, timestamp, jpeg):
+        if self.pending is not None:
+            self.frames_dropped += 1
+        self.pending = (timestamp, jpeg)
+        self.frames_received += 1
+        self.frame_ready.set()
+
+
+class ProctorServer:
+    def __init__(self, workers=None, event_writer=None, config=DEFAULT_CONFIG, phone_rate_hz=PHONE_CHECK_RATE_HZ):
+        self.workers = workers or os.cpu_count() or 1
+        self.event_writer = event_writer  # One log shared by every candidate
+        self.config = config              # Policy for candidates that don't send one
+        self.phone_rate_hz = phone_rate_hz
+        self.phones = None
+        self.pool = None
+        self.connections = {}
+        self.finished = deque(maxlen=FINISHED_KEPT)
+
+    def start_pool(self):
+        # Spawn (not fork) so workers never inherit client sockets, and load
+        # every worker's models before the first candidate connects
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_proc.get_context("spawn"),
+            initializer=_init_worker
+        )
+        list(self.pool.map(_ping, range(self.workers)))
+
+    def start_phone_checks(self):
+        """Batch phone detection across candidates (no-op when the rate is 0)."""
+        if not self.phone_rate_hz:
+            return
+        from detectors.model_registry import models
+        from detectors.phone_detector import PhoneBatcher
+        models.warm_up(["phone"])
+        self.phones = PhoneBatcher()
+
+    def shutdown(self):
+        if self.phones is not None:
+            self.phones.close()
+            self.phones = None
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+    async def handle_client(self, reader, writer):
+        try:
+            (length,) = HELLO_HEADER.unpack(await reader.readexactly(HELLO_HEADER.size))
+            hello = json.loads(await reader.readexactly(length))
+            # Each candidate may run under its own policy
+            config = self.config.replace(**hello.get("policy", {}))
+        except (asyncio.IncompleteReadError, ValueError, TypeError, AttributeError) as e:
+            print(f"Rejected client: {e}")
+            writer.close()
+            return
+
+        session_id = str(hello.get("session_id") or id(writer))
+        conn = CandidateConnection(session_id, self.event_writer, config)
+        self.connections[session_id] = conn
+        print(f"[{session_id}] connected")
+
+        processor = asyncio.create_task(self._process(conn, writer))
+        try:
+            while not conn.stopped and not processor.done():
+                header = await reader.readexactly(FRAME_HEADER.size)
+                timestamp, length = FRAME_HEADER.unpack(header)
+                conn.push(timestamp, await reader.readexactly(length))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            conn.closed = True
+            conn.frame_ready.set()
+            try:
+                await processor
+                if conn.phone_checks:
+                    await asyncio.gather(*conn.phone_checks, return_exceptions=True)
+            finally:
+                writer.close()
+                self._finish(conn)
+
+    async def _process(self, conn, writer):
+        loop = asyncio.get_running_loop()
+        while True:
+            if conn.pending is None:
+                if conn.closed:
+                    return
+                await conn.frame_ready.wait()
+                conn.frame_ready.clear()
+                continue
+
+            timestamp, jpeg = conn.pending
+            conn.pending = None
+            session = conn.session_at(timestamp)
+            if self._phone_check_due(conn, timestamp):
+                task = asyncio.create_task(self._check_phone(conn, writer, timestamp, jpeg))
+                conn.phone_checks.add(task)
+                task.add_done_callback(conn.phone_checks.discard)
+            detections = await loop.run_in_executor(self.pool, analyse_frame, jpeg)
+            if detections is None:
+                continue
+
+            observation = session.observe(*detections, timestamp)
+            decision = session.update(observation, timestamp)
+            conn.frames_processed += 1
+            for violation in decision.violations:
+                print(f"[{conn.session_id}] VIOLATION {session.violations.attempts}: {violation}")
+
+            reply = {
+                "seq": conn.frames_processed,
+                "violations": decision.violations,
+                "stop": decision.stop,
+                "reason": decision.reason,
+            }
+            try:
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+            except ConnectionError:
+                return
+            if decision.stop:
+                return
+
+    def _phone_check_due(self, conn, timestamp):
+        if self.phones is None:
+            return False
+        if conn.last_phone_check is not None and timestamp - conn.last_phone_check < 1.0 / self.phone_rate_hz:
+            return False
+        conn.last_phone_check = timestamp
+        return True
+
+    async def _check_phone(self, conn, writer, timestamp, jpeg):
+        """Decode a sampled frame, queue it for the next YOLO batch and report a phone."""
+        frame = await asyncio.to_thread(cv2.imdecode, np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return
+        try:
+            detection = await asyncio.wrap_future(self.phones.submit(frame))
+        except Exception as e:
+            print(f"[{conn.session_id}] Phone check failed: {e}")
+            return
+        if detection is None:
+            return
+        conn.phone_frames += 1
+        reply = {"timestamp": timestamp, "phone": {"box": list(detection.box), "confidence": detection.confidence}}
+        try:
+            writer.write((json.dumps(reply) + "\n").encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _finish(self, conn):
+        self.connections.pop(conn.session_id, None)
+        summary = {
+            "session_id": conn.session_id,
+            "frames_received": conn.frames_received,
+            "frames_processed": conn.frames_processed,
+            "frames_dropped": conn.frames_dropped,
+            "phone_frames": conn.phone_frames,
+            "total_violations": 0,
+            "violations_by_type": {},
+            "violations": [],
+        }
+        if conn.session is not None:
+            violations = conn.session.violations
+            conn.session.end("disconnected")
+            summary.update(
+                total_violations=violations.attempts,
+                violations_by_type=violations.summary(),
+                # Most recent violations only; the event log has every one
+                violations=[record.type for record in violations.records],
+            )
+        self.finished.append(summary)
+        print(f"[{conn.session_id}] disconnected - {summary['total_violations']} violations, "
+              f"{conn.frames_processed}/{conn.frames_received} frames processed")
+
+
+async def send_video(path, host, port, session_id=None, realtime=True, jpeg_quality=80):
+    """
+    Stand-in client: stream a recorded video to the server as if it came
+    from a candidate's webcam. Returns the list of replies received.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    hello = json.dumps({"session_id": session_id or os.path.basename(path)}).encode()
+    writer.write(HELLO_HEADER.pack(len(hello)) + hello)
+
+    replies = []
+
+    async def read_replies():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            replies.append(json.loads(line))
+
+    reply_task = asyncio.create_task(read_replies())
+
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    start = time.time()
+    frame_index = 0
+    try:
+        while True:
+            ret, frame = await asyncio.to_thread(cap.read)
+            if not ret or reply_task.done() or (replies and replies[-1].get("stop")):
+                break
+            timestamp = start + frame_index / fps
+            frame_index += 1
+
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+            if not ok:
+                continue
+            writer.write(FRAME_HEADER.pack(timestamp, len(jpeg)) + jpeg.tobytes())
+            await writer.drain()
+
+            if realtime:
+                delay = timestamp - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+    except ConnectionError:
+        pass
+    finally:
+        cap.release()
+        if writer.can_write_eof():
+            writer.write_eof()
+        await reply_task
+        writer.close()
+    return replies
+
+
+async def serve(host, port, workers, videos=None, realtime=True, event_log=None, phone_rate_hz=PHONE_CHECK_RATE_HZ):
+    event_writer = EventLogWriter(event_log) if event_log else None
+    server = ProctorServer(workers, event_writer, phone_rate_hz=phone_rate_hz)
+    server.start_pool()
+    server.start_phone_checks()
+    tcp_server = await asyncio.start_server(server.handle_client, host, port)
+    print(f"Proctor server listening on {host}:{port} with {server.workers} workers")
+
+    try:
+        async with tcp_server:
+            if videos:
+                # Simulated candidates, one per video; exit once they are done
+                await asyncio.gather(*(
+                    send_video(path, host, port, realtime=realtime) for path in videos
+                ))
+            else:
+                await tcp_server.serve_forever()
+    finally:
+        server.shutdown()
+        if event_writer is not None:
+            event_writer.close()
+    return server.finished
+
+
+def main():
+    from offline.batch_engine import find_videos
+
+    parser = argparse.ArgumentParser(description="Proctor many candidates from one process")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Inference processes (default: CPU count)")
+    parser.add_argument("--videos", nargs="*", help="Simulate one client per video file/directory")
+    parser.add_argument("--fast", action="store_true", help="Send simulated video as fast as possible")
+    parser.add_argument("--event-log", help="Append violation events for every session to this JSONL file")
+    parser.add_argument("--phone-rate", type=float, default=PHONE_CHECK_RATE_HZ,
+                        help="Phone checks per candidate per second, batched across candidates (0 = off)")
+    args = parser.parse_args()
+
+    videos = find_videos(args.videos) if args.videos else None
+    try:
+        finished = asyncio.run(serve(args.host, args.port, args.workers, videos, not args.fast, args.event_log,
+                                     args.phone_rate))
+    except KeyboardInterrupt:
+        return
+
+    print("\nSession Summary:")
+    for summary in finished:
+        print(f"  {summary['session_id']}: {summary['total_violations']} violations")
+        if summary["phone_frames"]:
+            print(f"    phone seen in {summary['phone_frames']} checked frames")
+        for v in summary["violations"]:
+            print(f"    - {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from collections import namedtuple
+from validators.face_alignment import is_face_aligned
+from validators.face_distance import is_face_distance_valid, face_area_ratio, area_ratio_in_range
+from detectors.head_pose_detector import head_pose, pose_within_limits
+from detectors.eye_gaze_detector import is_gaze_suspicious
+from detectors.landmarks import as_landmark_array, has_landmarks
+from utils.smoothing import OneEuroFilter, EmaFilter, Hysteresis
+from config.proctor_config import DEFAULT_CONFIG
+
+# What the detectors saw in one frame.
+# Fields after face_count are only meaningful when face_count == 1;
+# gaze_suspicious is only evaluated while the head is aligned.
+FrameObservation = namedtuple(
+    "FrameObservation",
+    ["face_count", "has_landmarks", "distance_valid", "aligned", "gaze_suspicious"],
+    defaults=(False,)
+)
+
+def observe_frame(faces, face_landmarks, frame_shape, config=DEFAULT_CONFIG):
+    """
+    Build a FrameObservation from detector outputs.
+
+    Args:
+        faces: Face boxes from the face detector
+        face_landmarks: (N, 3) landmark array of the single face, or None
+                        if the landmarker was not run or found nothing
+        frame_shape: Shape of the frame the boxes refer to
+        config: ProctorConfig with the thresholds to apply
+    """
+    if len(faces) != 1 or not has_landmarks(face_landmarks):
+        return FrameObservation(len(faces), False, False, False)
+
+    aligned = is_face_aligned(face_landmarks, frame_shape, config)
+    return FrameObservation(
+        face_count=1,
+        has_landmarks=True,
+        distance_valid=is_face_distance_valid(faces[0], frame_shape, config),
+        aligned=aligned,
+        # Eyes are only judged when the head is straight
+        gaze_suspicious=config.eye_movement_check and aligned and is_gaze_suspicious(face_landmarks, config)
+    )
+
+
+class ObservationFilter:
+    """
+    Streaming filter in front of observe_frame() for one session.
+
+    Landmarks go through a One Euro filter and the face box through an EMA,
+    both driven by frame timestamps, so a single noisy landmark or a
+    flickering Haar box no longer flips a check. Head alignment and face
+    distance then use hysteresis: a check only fails once the value is
+    `hysteresis_margin` past its limit and only passes again once it is
+    that far inside, so values hovering on a threshold don't keep arming
+    and resetting the session's timers.
+
+    State is one landmark array, one box and two flags; it is reset
+    whenever there isn't exactly one face with landmarks, so a different
+    face never inherits it. Filter parameters are read from the config on
+    every call and can change between frames.
+    """
+
+    def __init__(self):
+        self.landmarks = OneEuroFilter()
+        self.box = EmaFilter()
+        self.aligned = Hysteresis()
+        self.distance_valid = Hysteresis()
+
+    def reset(self):
+        self.landmarks.reset()
+        self.box.reset()
+        self.aligned.reset()
+        self.distance_valid.reset()
+
+    def observe(self, faces, face_landmarks, frame_shape, timestamp, config=DEFAULT_CONFIG):
+        """Like observe_frame(), on smoothed detector outputs (if config.smoothing)."""
+        if not config.smoothing or len(faces) != 1 or not has_landmarks(face_landmarks):
+            self.reset()
+            return observe_frame(faces, face_landmarks, frame_shape, config)
+
+        points = self.landmarks.update(
+            as_landmark_array(face_landmarks), timestamp,
+            config.landmark_min_cutoff, config.landmark_beta
+        )
+        box = self.box.update(faces[0], timestamp, config.box_smoothing_seconds)
+        margin = config.hysteresis_margin
+
+        pose = head_pose(points, frame_shape, config)
+        aligned = self.aligned.update(
+            pose_within_limits(pose, 1 + margin),
+            pose_within_limits(pose, 1 - margin)
+        )
+
+        ratio = face_area_ratio(box, frame_shape)
+        distance_valid = self.distance_valid.update(
+            area_ratio_in_range(ratio, config, -margin),
+            area_ratio_in_range(ratio, config, margin)
+        )
+
+        return FrameObservation(
+            face_count=1,
+            has_landmarks=True,
+            distance_valid=bool(distance_valid),
+            aligned=bool(aligned),
+            gaze_suspicious=bool(config.eye_movement_check and aligned and is_gaze_suspicious(points, config))
+        )
@@ -0,0 +1,263 @@
+import time
+from collections import namedtuple
+from timers.countdown_timer import CountdownTimer
+from violations.violation_manager import ViolationManager
+from violations import violation_types as vt
+from violations.event_log import SESSION_START, SESSION_END
+from session.observation import FrameObservation, ObservationFilter, observe_frame
+from config.proctor_config import DEFAULT_CONFIG
+
+# What the session decided for one frame
+SessionDecision = namedtuple("SessionDecision", ["violations", "stop", "reason"])
+
+
+class ProctorSession:
+    """
+    Violation state machine for one candidate, independent of capture,
+    inference and display.
+
+    Every timer reads the session's own notion of "now", which is the
+    timestamp passed to update() (or `clock()` when none is given). Live
+    sessions use wall-clock time; recorded sessions pass frame timestamps
+    and replay as fast as the observations can be fed in.
+
+    Delays, grace periods and the violation limit come from the session's
+    ProctorConfig, which set_config() can swap between frames. observe()
+    turns raw detector outputs into observations through the session's own
+    ObservationFilter.
+    """
+
+    def __init__(self, clock=time.time, duration=None, verbose=True,
+                 event_log=None, evidence=None, config=DEFAULT_CONFIG):
+        """
+        Args:
+            duration: Test length in seconds (default: config.test_duration_seconds)
+            config: ProctorConfig for this session
+            event_log: Optional SessionEventLog receiving session start/end
+                       and every violation as it is registered
+            evidence: Optional EvidenceRecorder that saves keyframes around
+                      each violation
+        """
+        if duration is None:
+            duration = config.test_duration_seconds
+        self.clock = clock
+        self.config = config
+        self.duration = duration
+        self.verbose = verbose
+        self.now = clock()
+        self.start_time = self.now
+        self.event_log = event_log
+
+        self.violations = ViolationManager(
+            clock=self._now, verbose=verbose, event_log=event_log, evidence=evidence,
+            max_violations=config.max_violations, type_limits=config.max_violations_per_type
+        )
+        self.test_timer = self._timer(duration)
+        self.face_aligned = False
+        self.stopped = False
+        self.ended = False
+        self.frames_processed = 0
+        self.filter = ObservationFilter()
+
+        # Grace timers for different violation types
+        self.no_face_timer = None
+        self.multiple_faces_timer = None
+        self.face_distance_timer = None
+        self.head_movement_timer = None
+        self.eye_movement_timer = None
+        self.violation_grace_timer = None  # Global grace period after ANY violation
+
+        if event_log is not None:
+            event_log.emit(SESSION_START, self.start_time, duration=duration)
+
+    def set_config(self, config):
+        """
+        Apply a new config from the next frame on. Running timers keep the
+        duration they started with; the test length is fixed at start.
+        """
+        self.config = config
+        self.violations.set_limits(config.max_violations, config.max_violations_per_type)
+
+    def observe(self, faces, face_landmarks, frame_shape, timestamp=None):
+        """FrameObservation for one frame, smoothed by this session's filter."""
+        timestamp = self.clock() if timestamp is None else timestamp
+        return self.filter.observe(faces, face_landmarks, frame_shape, timestamp, self.config)
+
+    def _now(self):
+        return self.now
+
+    def _timer(self, duration):
+        return CountdownTimer(duration, clock=self._now)
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def expired(self):
+        return self.test_timer.expired()
+
+    def time_left(self):
+        return self.test_timer.remaining()
+
+    def update(self, observation, timestamp=None):
+        """
+        Advance the session to `timestamp` with one frame's observation.
+        Returns a SessionDecision listing violations registered this frame
+        and whether the test must stop.
+        """
+        self.now = self.clock() if timestamp is None else timestamp
+        self.frames_processed += 1
+        registered = []
+
+        if self.stopped:
+            return SessionDecision(registered, True, "stopped")
+        if self.expired():
+            return self._stop(registered, "time_limit", "Test time limit reached")
+
+        # Check for no face detection
+        if observation.face_count == 0:
+            if self.no_face_timer is None:
+                # No face detected - wait before counting as violation
+                self.no_face_timer = self._timer(self.config.no_face_delay)
+            elif self.no_face_timer.expired():
+                if not self._register(vt.NO_FACE, registered):
+                    return self._max_violations(registered)
+                # Start grace timer to detect face
+                self.no_face_timer = self._timer(self.config.no_face_grace_period)
+                self._log(f"No face detected - violation counted. Waiting {self.config.no_face_grace_period}s for face...")
+            self.face_aligned = False
+            # Skip all other checks when no face is detected
+            return SessionDecision(registered, False, None)
+
+        if self.no_face_timer is not None:
+            self._log("Face detected - timer reset")
+        self.no_face_timer = None
+
+        # Check for multiple faces
+        if observation.face_count > 1:
+            if self.multiple_faces_timer is None:
+                self.multiple_faces_timer = self._timer(self.config.multiple_faces_delay)
+            elif self.multiple_faces_timer.expired():
+                if not self._register(vt.MULTIPLE_FACES, registered):
+                    return self._max_violations(registered)
+                # Start grace timer for faces to go back to 1
+                self.multiple_faces_timer = self._timer(self.config.no_face_grace_period)
+                self._log(f"Multiple faces detected - violation counted. Waiting {self.config.no_face_grace_period}s...")
+            self.face_aligned = False
+            # Skip all other checks when multiple faces detected
+            return SessionDecision(registered, False, None)
+
+        if self.multiple_faces_timer is not None:
+            self._log("Multiple faces resolved - timer reset")
+        self.multiple_faces_timer = None
+
+        # Single face, but the landmarker found nothing
+        if not observation.has_landmarks:
+            self.face_aligned = False
+            self.head_movement_timer = None
+            self.eye_movement_timer = None
+            return SessionDecision(registered, False, None)
+
+        # Check face distance (too close or too far)
+        if not observation.distance_valid:
+            if self.face_distance_timer is None:
+                self.face_distance_timer = self._timer(self.config.face_distance_delay)
+            elif self.face_distance_timer.expired():
+                if not self._register(vt.FACE_DISTANCE, registered):
+                    return self._max_violations(registered)
+                # Start grace period after violation
+                self.violation_grace_timer = self._timer(self.config.violation_grace_period)
+                self.face_distance_timer = None
+                self._log("Face distance violation counted")
+            self.face_aligned = False
+            return SessionDecision(registered, False, None)
+
+        if self.face_distance_timer is not None:
+            self._log("Face distance valid - timer reset")
+        self.face_distance_timer = None
+
+        # Skip other violation checks during the global grace period
+        if self.violation_grace_timer is not None and not self.violation_grace_timer.expired():
+            return SessionDecision(registered, False, None)
+        self.violation_grace_timer = None
+
+        # Head alignment check
+        self.face_aligned = observation.aligned
+        if not self.face_aligned:
+            if self.head_movement_timer is None:
+                self.head_movement_timer = self._timer(self.config.head_movement_grace_period)
+            elif self.head_movement_timer.expired():
+                if not self._register(vt.HEAD_MOVEMENT, registered):
+                    return self._max_violations(registered)
+                self.violation_grace_timer = self._timer(self.config.violation_grace_period)
+                self._log("Head movement violation counted")
+                self.head_movement_timer = None
+
+            # Do NOT evaluate eyes when head is not aligned
+            self.eye_movement_timer = None
+            return SessionDecision(registered, False, None)
+
+        if self.head_movement_timer is not None:
+            self._log("Head straight - timer reset")
+        self.head_movement_timer = None
+
+        # Eye movement check (ONLY when head is straight)
+        if observation.gaze_suspicious:
+            if self.eye_movement_timer is None:
+                self.eye_movement_timer = self._timer(self.config.eye_movement_grace_period)
+            elif self.eye_movement_timer.expired():
+                if not self._register(vt.EYE_MOVEMENT, registered):
+                    return self._max_violations(registered)
+                self.violation_grace_timer = self._timer(self.config.violation_grace_period)
+                self._log("Eye movement violation counted")
+                self.eye_movement_timer = None
+        else:
+            if self.eye_movement_timer is not None:
+                self._log("Eyes back on screen - timer reset")
+            self.eye_movement_timer = None
+
+        return SessionDecision(registered, False, None)
+
+    def _register(self, violation, registered):
+        registered.append(violation)
+        return self.violations.register(violation)
+
+    def _max_violations(self, registered):
+        return self._stop(registered, "max_violations", "Max violations reached - test stopped")
+
+    def _stop(self, registered, reason, message):
+        self.stopped = True
+        self._log(message)
+        self.end(reason)
+        return SessionDecision(registered, True, reason)
+
+    def end(self, reason):
+        """Record the end of the session (once), e.g. when the candidate quits."""
+        if self.ended:
+            return
+        self.ended = True
+        if self.event_log is not None:
+            self.event_log.emit(
+                SESSION_END, self.now,
+                reason=reason,
+                total_violations=self.violations.attempts,
+                frames=self.frames_processed
+            )
+
+
+def replay(observations, duration=float("inf"), **kwargs):
+    """
+    Run a session over (timestamp, FrameObservation) pairs as fast as
+    possible. Returns (session, [(timestamp, violation), ...]).
+    """
+    session = None
+    timeline = []
+    for timestamp, observation in observations:
+        if session is None:
+            session = ProctorSession(clock=lambda t=timestamp: t, duration=duration, verbose=False, **kwargs)
+        decision = session.update(observation, timestamp)
+        for violation in decision.violations:
+            timeline.append((timestamp, violation))
+        if decision.stop:
+            break
+    return session, timeline
@@ -1,12 +1,22 @@
 import time
 
 class CountdownTimer:
-    def __init__(self, duration):
+    def __init__(self, duration, clock=time.time):
+        """
+        Args:
+            duration: Seconds until the timer expires
+            clock: Zero-argument callable returning the current time in
+                   seconds; inject a replay clock to run faster than real time
+        """
         self.duration = duration
-        self.start_time = time.time()
+        self.clock = clock
+        self.start_time = clock()
 
     def expired(self):
-        return (time.time() - self.start_time) >= self.duration
+        return (self.clock() - self.start_time) >= self.duration
+
+    def remaining(self):
+        return max(0, self.duration - (self.clock() - self.start_time))
 
     def reset(self):
-        self.start_time = time.time()
+        self.start_time = self.clock()
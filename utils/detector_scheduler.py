@@ -0,0 +1,110 @@
+import time
+
+
+class ScheduledDetector:
+    def __init__(self, name, fn, rate_hz=None, boosted_rate_hz=None, budget_ms=None):
+        """
+        Args:
+            name: Detector name used with DetectorScheduler.run()
+            fn: Callable producing the detector result
+            rate_hz: Target runs per second (None = every frame)
+            boosted_rate_hz: Rate while boosted, e.g. when a related timer is armed
+            budget_ms: CPU milliseconds per second this detector may use;
+                       the effective rate is lowered to stay within it
+        """
+        self.name = name
+        self.fn = fn
+        self.rate_hz = rate_hz
+        self.boosted_rate_hz = boosted_rate_hz
+        self.budget_ms = budget_ms
+        self.boosted = False
+
+        self.last_run = None
+        self.last_result = None
+        self.avg_cost_ms = 0.0
+        self.runs = 0
+        self.skips = 0
+
+    def effective_rate(self):
+        """Runs per second after boosting and the cost budget (None = every frame)."""
+        rate = self.rate_hz
+        if self.boosted and self.boosted_rate_hz is not None:
+            rate = self.boosted_rate_hz
+        if self.budget_ms is not None and self.avg_cost_ms > 0:
+            budget_rate = self.budget_ms / self.avg_cost_ms
+            rate = budget_rate if rate is None else min(rate, budget_rate)
+        return rate
+
+    def due(self, now):
+        if self.last_run is None:
+            return True
+        rate = self.effective_rate()
+        if rate is None:
+            return True
+        # Small tolerance so a rate equal to the frame rate isn't halved by jitter
+        return (now - self.last_run) >= 1.0 / rate - 0.001
+
+
+class DetectorScheduler:
+    """
+    Runs each detector at its own rate and serves the cached result on the
+    frames in between, so expensive checks don't have to run at the camera
+    frame rate.
+
+    Cost is measured on every run and smoothed, and detectors with a budget
+    slow themselves down when they get more expensive. Rates are expressed
+    against the `now` passed to run() (frame timestamps), so replays
+    schedule exactly as live sessions do.
+    """
+
+    def __init__(self, clock=time.time, cost_smoothing=0.2):
+        self.clock = clock
+        self.cost_smoothing = cost_smoothing
+        self.detectors = {}
+
+    def register(self, name, fn, rate_hz=None, boosted_rate_hz=None, budget_ms=None):
+        self.detectors[name] = ScheduledDetector(name, fn, rate_hz, boosted_rate_hz, budget_ms)
+        return self.detectors[name]
+
+    def boost(self, name, active=True):
+        """Raise a detector to its boosted rate while `active` is True."""
+        self.detectors[name].boosted = bool(active)
+
+    def invalidate(self, name):
+        """Drop the cached result so the detector runs on its next call."""
+        detector = self.detectors[name]
+        detector.last_run = None
+        detector.last_result = None
+
+    def run(self, name, *args, now=None, **kwargs):
+        """Return a fresh result if the detector is due, else the cached one."""
+        detector = self.detectors[name]
+        if now is None:
+            now = self.clock()
+
+        if not detector.due(now):
+            detector.skips += 1
+            return detector.last_result
+
+        start = time.perf_counter()
+        detector.last_result = detector.fn(*args, **kwargs)
+        cost_ms = (time.perf_counter() - start) * 1000
+
+        if detector.runs == 0:
+            detector.avg_cost_ms = cost_ms
+        else:
+            detector.avg_cost_ms += self.cost_smoothing * (cost_ms - detector.avg_cost_ms)
+        detector.runs += 1
+        detector.last_run = now
+        return detector.last_result
+
+    def stats(self):
+        return {
+            name: {
+                "runs": d.runs,
+                "skips": d.skips,
+                "avg_cost_ms": round(d.avg_cost_ms, 2),
+                "effective_rate_hz": d.effective_rate(),
+            }
+            for name, d in self.detectors.items()
+        }
@@ -1,7 +1,7 @@
 import cv2
 import numpy as np
-from mediapipe.tasks.python.vision import FaceLandmarker, FaceLandmarkerOptions, RunningMode
-from mediapipe.tasks.python.core import base_options
+from functools import lru_cache
+from detectors.landmarks import as_landmark_array, to_pixels
 
 # Face mesh connections (from MediaPipe)
 FACE_MESH_CONNECTIONS = [
@@ -30,56 +30,110 @@ FACE_MESH_CONNECTIONS = [
     (162, 21), (21, 54), (54, 103), (103, 67), (67, 109), (109, 10),
 ]
 
+# Connection endpoints as an (M, 2) index array for vectorized lookups
+CONNECTION_INDEX = np.array(FACE_MESH_CONNECTIONS, dtype=np.int32)
+
+# Pixel offsets of a small landmark dot (centre plus 4-neighbours)
+DOT_OFFSETS = np.array([(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)], dtype=np.int32)
+
+# Opacity of the mesh overlay
+MESH_ALPHA = 0.4
+
+
+@lru_cache(maxsize=128)
+def _text_sprite(text, font_scale, thickness):
+    """
+    Rasterize text once into a boolean mask. HUD strings repeat from frame
+    to frame, so later draws are a masked copy instead of a putText call.
+    Returns (mask, ascent) where ascent is the distance from the top of the
+    mask to the text baseline.
+    """
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    (text_w, text_h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+    pad = thickness
+    canvas = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad), dtype=np.uint8)
+    cv2.putText(canvas, text, (pad, text_h + pad), font, font_scale, 255, thickness)
+    return canvas > 0, text_h + pad
+
+
+def _blit_text(frame, text, origin, font_scale, color, thickness):
+    """Draw cached text with its baseline starting at origin (x, y)."""
+    mask, ascent = _text_sprite(text, font_scale, thickness)
+    x0 = origin[0] - thickness
+    y0 = origin[1] - ascent
+
+    # Clip the sprite to the frame
+    h, w = frame.shape[:2]
+    mx0, my0 = max(0, -x0), max(0, -y0)
+    mx1 = min(mask.shape[1], w - x0)
+    my1 = min(mask.shape[0], h - y0)
+    if mx1 <= mx0 or my1 <= my0:
+        return
+
+    region = frame[y0 + my0:y0 + my1, x0 + mx0:x0 + mx1]
+    region[mask[my0:my1, mx0:mx1]] = color
+
+
+def text_width(text, font_scale, thickness):
+    mask, _ = _text_sprite(text, font_scale, thickness)
+    return mask.shape[1] - 2 * thickness
+
+
 def draw_text(frame, text, y):
-    cv2.putText(frame, text, (30, y),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.9,
-                (0, 255, 255), 2)
+    _blit_text(frame, text, (30, y), 0.9, (0, 255, 255), 2)
 
 def draw_face_mesh(frame, face_landmarks):
     """
-    Draw face mesh landmarks with white color and 70% transparency.
+    Draw face mesh landmarks in white over the face region.
     Uses thin lines.
+
+    Only the landmark bounding box is copied and blended, and all mesh
+    lines are drawn with a single polylines call.
     
     Args:
         frame: The input frame to draw on
-        face_landmarks: MediaPipe face landmarks list
+        face_landmarks: List of faces, each an (N, 3) landmark array
+                        (or a MediaPipe landmark list)
     """
     if not face_landmarks or len(face_landmarks) == 0:
         return
-    
-    # Create overlay for transparency
-    overlay = frame.copy()
-    
+
+    points = as_landmark_array(face_landmarks[0])
+    if points is None:
+        return
+
     # White color in BGR
     white = (255, 255, 255)
     
-    # Extract landmarks from the first detected face
-    # face_landmarks[0] is already the list of landmark objects
-    landmarks_list = face_landmarks[0]
+    # Convert all normalized coordinates to pixel coordinates at once
     h, w = frame.shape[:2]
-    
-    # Draw face mesh connections with thin lines
-    for connection in FACE_MESH_CONNECTIONS:
-        start_idx, end_idx = connection
-        if start_idx < len(landmarks_list) and end_idx < len(landmarks_list):
-            start = landmarks_list[start_idx]
-            end = landmarks_list[end_idx]
-            
-            # Convert normalized coordinates to pixel coordinates
-            start_pos = (int(start.x * w), int(start.y * h))
-            end_pos = (int(end.x * w), int(end.y * h))
-            
-            # Draw line on overlay (thin line with thickness=1)
-            cv2.line(overlay, start_pos, end_pos, white, 1)
-    
-    # Draw individual landmarks as small circles (for better visibility)
-    for landmark in landmarks_list:
-        x = int(landmark.x * w)
-        y = int(landmark.y * h)
-        cv2.circle(overlay, (x, y), 1, white, 1)
-    
-    # Blend overlay with frame (70% transparency = 30% opacity of overlay)
-    cv2.addWeighted(overlay, 0.4, frame, 0.8, 0, frame)
+    pixels = to_pixels(points, frame.shape)
+
+    # Region covered by the mesh (plus room for the dots), clipped to the frame
+    x0, y0 = np.maximum(pixels.min(axis=0) - 1, 0)
+    x1, y1 = np.minimum(pixels.max(axis=0) + 2, (w, h))
+    if x1 <= x0 or y1 <= y0:
+        return
+
+    roi = frame[y0:y1, x0:x1]
+    overlay = roi.copy()
+    local = pixels - (x0, y0)
+
+    # Draw every mesh connection in one call
+    connections = CONNECTION_INDEX[(CONNECTION_INDEX < len(local)).all(axis=1)]
+    cv2.polylines(overlay, local[connections], False, white, 1)
+
+    # Draw individual landmarks as small dots (for better visibility)
+    dots = (local[:, None, :] + DOT_OFFSETS).reshape(-1, 2)
+    inside = (
+        (dots[:, 0] >= 0) & (dots[:, 0] < overlay.shape[1]) &
+        (dots[:, 1] >= 0) & (dots[:, 1] < overlay.shape[0])
+    )
+    dots = dots[inside]
+    overlay[dots[:, 1], dots[:, 0]] = white
+
+    # Blend only the face region; untouched pixels keep their value
+    cv2.addWeighted(overlay, MESH_ALPHA, roi, 1 - MESH_ALPHA, 0, roi)
 
 def draw_violations(frame, violations):
     """
@@ -95,7 +149,6 @@ def draw_violations(frame, violations):
     
     h, w = frame.shape[:2]
     red = (0, 0, 255)  # BGR format
-    font = cv2.FONT_HERSHEY_SIMPLEX
     font_scale = 0.7
     thickness = 2
     line_spacing = 30  # pixels between each violation text
@@ -108,10 +161,8 @@ def draw_violations(frame, violations):
         # Calculate y position from bottom upwards
         y_position = h - margin_bottom - (i * line_spacing)
         
-        # Get text size to right-align it
-        text_size = cv2.getTextSize(violation, font, font_scale, thickness)[0]
-        x_position = w - margin_right - text_size[0]
+        # Right-align using the cached text size
+        x_position = w - margin_right - text_width(violation, font_scale, thickness)
         
         # Draw red text
-        cv2.putText(frame, violation, (x_position, y_position),
-                    font, font_scale, red, thickness)
+        _blit_text(frame, violation, (x_position, y_position), font_scale, red, thickness)
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+from utils.frame_proxy import FrameProxy
+
+
+class FramePacket:
+    """
+    One frame plus the derived views the detectors need, each computed at
+    most once per frame and only when first asked for:
+
+        image     full-resolution BGR frame (display / recording)
+        small     downscaled proxy the detectors run on (see FrameProxy)
+        gray      grayscale of `small`, for the Haar cascades
+        rgb       RGB of `small`, for MediaPipe
+        mp_image  mp.Image wrapping `rgb`
+
+    A packet is reused for every frame of a stream: load() swaps in the next
+    frame and the conversions write into buffers allocated on the first frame.
+    Views are only valid until the next load().
+    """
+
+    def __init__(self, proxy=None):
+        self.proxy = proxy if proxy is not None else FrameProxy(None)
+        self.image = None
+        self.timestamp = None
+        self._gray_buffer = None
+        self._rgb_buffer = None
+        self._clear()
+
+    def load(self, image, timestamp=None):
+        self.image = image
+        self.timestamp = timestamp
+        self._clear()
+        return self
+
+    def _clear(self):
+        self._small = None
+        self._gray = None
+        self._rgb = None
+        self._mp_image = None
+
+    @property
+    def shape(self):
+        """Shape of the detection frame; box and landmark pixels refer to it."""
+        return self.small.shape
+
+    @property
+    def small(self):
+        if self._small is None:
+            self._small = self.proxy.resize(self.image)
+        return self._small
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            small = self.small
+            self._gray_buffer = _reuse(self._gray_buffer, small.shape[:2], small.dtype)
+            self._gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray_buffer)
+        return self._gray
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            small = self.small
+            self._rgb_buffer = _reuse(self._rgb_buffer, small.shape, small.dtype)
+            self._rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        return self._rgb
+
+    @property
+    def mp_image(self):
+        if self._mp_image is None:
+            self._mp_image = _wrap_mp_image(self.rgb)
+        return self._mp_image
+
+    def to_full_boxes(self, boxes):
+        """Map boxes found on the detection frame to full-resolution pixels."""
+        return self.proxy.to_full_boxes(boxes)
+
+
+def _reuse(buffer, shape, dtype):
+    if buffer is None or buffer.shape != shape:
+        return np.empty(shape, dtype=dtype)
+    return buffer
+
+
+def _wrap_mp_image(rgb):
+    # mediapipe is imported on first use; by then the landmarker has loaded it
+    import mediapipe as mp
+    return mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+
+
+def to_gray(frame):
+    """Grayscale view of a FramePacket (cached) or a BGR array (converted)."""
+    if isinstance(frame, FramePacket):
+        return frame.gray
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def to_mp_image(frame):
+    """mp.Image of a FramePacket (cached) or a BGR array (converted)."""
+    if isinstance(frame, FramePacket):
+        return frame.mp_image
+    return _wrap_mp_image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+
+class FrameProxy:
+    """
+    Downscaled copy of each frame for the detectors.
+
+    Frames wider than `max_width` are resized (INTER_AREA) into a buffer
+    that is allocated once and reused, so a 1080p webcam costs the cascade
+    and the landmarker the same as a 640 px one. Face boxes found on the
+    proxy are mapped back to full-resolution pixels with to_full_boxes().
+    Landmarks are normalized to [0, 1] and need no mapping.
+
+    The full-resolution frame is still used for display and recording.
+    """
+
+    def __init__(self, max_width=640):
+        """
+        Args:
+            max_width: Proxy width in pixels (None or 0 = no downscaling)
+        """
+        self.max_width = max_width
+        self.scale = 1.0          # proxy pixels per full-resolution pixel
+        self._buffer = None
+        self._full_shape = None
+
+    def resize(self, frame):
+        """Return the proxy frame (the frame itself if it is already small enough)."""
+        h, w = frame.shape[:2]
+        if not self.max_width or w <= self.max_width:
+            self.scale = 1.0
+            return frame
+
+        if frame.shape != self._full_shape:
+            # Capture size changed (or first frame): size the buffer once
+            self._full_shape = frame.shape
+            self.scale = self.max_width / w
+            proxy_h = max(1, round(h * self.scale))
+            self._buffer = np.empty((proxy_h, self.max_width) + frame.shape[2:], dtype=frame.dtype)
+
+        cv2.resize(frame, (self._buffer.shape[1], self._buffer.shape[0]), dst=self._buffer,
+                   interpolation=cv2.INTER_AREA)
+        return self._buffer
+
+    def to_full_boxes(self, boxes):
+        """Map (x, y, w, h) boxes from proxy to full-resolution pixels."""
+        if self.scale == 1.0 or len(boxes) == 0:
+            return boxes
+        return np.round(np.asarray(boxes, dtype=np.float64) / self.scale).astype(np.int32)
@@ -0,0 +1,198 @@
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+
+WINDOW = "window"
+MJPEG = "mjpeg"
+NONE = "none"
+
+
+class LatestFrameSlot:
+    """
+    Single-slot mailbox between the processing loop and a preview thread.
+
+    Triple-buffered: the producer copies into a spare buffer and publishes it
+    with a pointer swap, the consumer swaps the published buffer out to read
+    it. Neither side ever waits on the other's work, and a frame the consumer
+    has not picked up yet is simply replaced by the next one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spare = None
+        self._ready = None
+        self._reading = None
+        self._fresh = False
+        self._event = threading.Event()
+        self.frames_published = 0
+        self.frames_replaced = 0
+
+    def put(self, frame):
+        if self._spare is None or self._spare.shape != frame.shape:
+            self._spare = np.empty_like(frame)
+        np.copyto(self._spare, frame)
+
+        with self._lock:
+            if self._fresh:
+                self.frames_replaced += 1
+            self._spare, self._ready = self._ready, self._spare
+            self._fresh = True
+            self.frames_published += 1
+        self._event.set()
+
+    def take(self, timeout=None):
+        """Return the newest unread frame, or None if none arrived in time."""
+        if not self._event.wait(timeout):
+            return None
+        with self._lock:
+            self._event.clear()
+            if not self._fresh:
+                return None
+            self._reading, self._ready = self._ready, self._reading
+            self._fresh = False
+            return self._reading
+
+    def wake(self):
+        """Release a consumer blocked in take()."""
+        self._event.set()
+
+
+class PreviewSink:
+    """
+    Base preview output. submit() is called from the processing loop and
+    must stay cheap; anything slow happens on the sink's own thread.
+    """
+
+    def __init__(self):
+        self.quit_requested = False
+
+    def wants_frame(self):
+        """False when the next frame would not be shown, so callers can skip drawing overlays."""
+        return False
+
+    def submit(self, frame):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullPreview(PreviewSink):
+    """Headless mode: frames are not rendered anywhere."""
+
+
+class _ThreadedPreview(PreviewSink):
+    def __init__(self, name):
+        super().__init__()
+        self.slot = LatestFrameSlot()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def wants_frame(self):
+        return True
+
+    def submit(self, frame):
+        self.slot.put(frame)
+
+    def close(self):
+        self._stop.set()
+        self.slot.wake()
+        self._thread.join(timeout=2.0)
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class DisplayPreview(_ThreadedPreview):
+    """
+    Shows frames in an OpenCV window from a background thread, so imshow
+    and waitKey are out of the processing loop. Pressing `q` sets
+    quit_requested.
+
+    HighGUI windows must live on the main thread on macOS, so
+    create_preview() uses the MJPEG preview there instead. If the window
+    cannot be created (no display, headless OpenCV build) a warning is
+    printed and the run continues without a preview.
+    """
+
+    def __init__(self, window_name="Online Test Proctoring"):
+        self.window_name = window_name
+        self.failed = False
+        super().__init__("display-preview")
+
+    def wants_frame(self):
+        return not self.failed
+
+    def _run(self):
+        try:
+            cv2.namedWindow(self.window_name)
+        except cv2.error as e:
+            self.failed = True
+            print(f"WARNING: Could not open preview window ({e.err}); continuing without preview")
+            return
+        while not self._stop.is_set():
+            frame = self.slot.take(timeout=0.03)
+            if frame is not None:
+                cv2.imshow(self.window_name, frame)
+            # Pump GUI events even when no new frame arrived
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                self.quit_requested = True
+        cv2.destroyWindow(self.window_name)
+
+
+class MjpegPreview(_ThreadedPreview):
+    """
+    Writes a low-rate Motion-JPEG recording of the annotated frames.
+    Frames arriving faster than `fps` are declined by wants_frame(), so
+    they are never annotated or copied.
+    """
+
+    def __init__(self, path, fps=5):
+        self.path = path
+        self.fps = fps
+        self._interval = 1.0 / fps
+        self._last_submit = None
+        self.frames_written = 0
+        super().__init__("mjpeg-preview")
+
+    def wants_frame(self):
+        return self._last_submit is None or time.monotonic() - self._last_submit >= self._interval
+
+    def submit(self, frame):
+        self._last_submit = time.monotonic()
+        self.slot.put(frame)
+
+    def _run(self):
+        writer = None
+        while not self._stop.is_set():
+            frame = self.slot.take(timeout=0.1)
+            if frame is None:
+                continue
+            if writer is None:
+                h, w = frame.shape[:2]
+                writer = cv2.VideoWriter(
+                    self.path, cv2.VideoWriter_fourcc(*"MJPG"), self.fps, (w, h)
+                )
+                if not writer.isOpened():
+                    print(f"WARNING: Could not open preview file {self.path}")
+                    return
+            writer.write(frame)
+            self.frames_written += 1
+        if writer is not None:
+            writer.release()
+
+
+def create_preview(mode, mjpeg_path="preview.avi", mjpeg_fps=5):
+    if mode == WINDOW:
+        if sys.platform != "darwin":
+            return DisplayPreview()
+        print(f"WARNING: Preview windows need the main thread on macOS; writing {mjpeg_path} instead")
+        mode = MJPEG
+    if mode == MJPEG:
+        return MjpegPreview(mjpeg_path, mjpeg_fps)
+    if mode == NONE:
+        return NullPreview()
+    raise ValueError(f"Unknown preview mode: {mode}")
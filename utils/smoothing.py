@@ -0,0 +1,111 @@
+import math
+import numpy as np
+
+
+def _alpha(dt, cutoff):
+    """Smoothing factor of a first-order low-pass at `cutoff` Hz over dt seconds."""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al.) over a scalar or an array, e.g. a whole
+    (478, 3) landmark array at once.
+
+    A low-pass whose cutoff rises with the signal's speed: jitter while the
+    head is still is smoothed away, while real movement passes with little
+    lag. Works on irregular timestamps, so skipped frames are fine. Keeps
+    only the last value, its derivative and timestamp.
+    """
+
+    def __init__(self, d_cutoff=1.0):
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self._derivative = None
+        self._timestamp = None
+
+    def update(self, value, timestamp, min_cutoff, beta):
+        """
+        Filter one sample and return the smoothed value.
+
+        Args:
+            min_cutoff: Cutoff in Hz while the signal is still (lower = smoother)
+            beta: How fast the cutoff rises with speed (higher = less lag)
+        """
+        value = np.asarray(value, dtype=np.float64)
+        if self.value is None:
+            self.value = value.copy()
+            self._derivative = np.zeros_like(self.value)
+            self._timestamp = timestamp
+            return self.value
+
+        dt = timestamp - self._timestamp
+        if dt <= 0:
+            return self.value
+        self._timestamp = timestamp
+
+        derivative = (value - self.value) / dt
+        self._derivative += _alpha(dt, self.d_cutoff) * (derivative - self._derivative)
+
+        # Per-element cutoff: fast-moving points are smoothed less
+        cutoff = min_cutoff + beta * np.abs(self._derivative)
+        self.value += _alpha(dt, cutoff) * (value - self.value)
+        return self.value
+
+
+class EmaFilter:
+    """
+    Exponential moving average with a time constant in seconds, so the
+    amount of smoothing doesn't depend on the frame rate.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self._timestamp = None
+
+    def update(self, value, timestamp, time_constant):
+        value = np.asarray(value, dtype=np.float64)
+        if self.value is None or time_constant <= 0:
+            self.value = value.copy()
+            self._timestamp = timestamp
+            return self.value
+
+        dt = timestamp - self._timestamp
+        if dt <= 0:
+            return self.value
+        self._timestamp = timestamp
+
+        self.value += (1.0 - math.exp(-dt / time_constant)) * (value - self.value)
+        return self.value
+
+
+class Hysteresis:
+    """
+    Boolean "within limits" state with a dead band around the limits.
+
+    The state only goes out once the value is past the widened limits and
+    only comes back once it is inside the narrowed limits. A value
+    hovering on a threshold therefore keeps its state instead of flickering.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.inside = True
+
+    def update(self, inside_wide, inside_narrow):
+        """
+        Args:
+            inside_wide: Value is within the limits widened by the margin
+            inside_narrow: Value is within the limits narrowed by the margin
+        """
+        self.inside = inside_wide if self.inside else inside_narrow
+        return self.inside
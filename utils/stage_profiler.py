@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+# Shared no-op context returned while profiling is disabled
+_NULL_STAGE = nullcontext()
+
+
+class StageStats:
+    """Latency samples for one stage, kept in a fixed-size ring of recent runs."""
+
+    def __init__(self, name, window):
+        self.name = name
+        self.samples_ms = np.zeros(window, dtype=np.float64)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms):
+        self.samples_ms[self.count % len(self.samples_ms)] = elapsed_ms
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def summary(self):
+        recent = self.samples_ms[:min(self.count, len(self.samples_ms))]
+        result = {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+        values = np.percentile(recent, PERCENTILES) if len(recent) else [0.0] * len(PERCENTILES)
+        for p, value in zip(PERCENTILES, values):
+            result[f"p{p}_ms"] = round(float(value), 3)
+        return result
+
+
+class _Stage:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add((time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class StageProfiler:
+    """
+    Per-stage wall-clock timing for the proctoring loop.
+
+        with profiler.stage("face_mesh"):
+            result = face_mesh.detect(image)
+        profiler.frame_done()
+
+    Percentiles are computed over the last `window` runs of each stage.
+    When disabled, stage() returns a shared no-op context and frame_done()
+    returns immediately, so instrumentation can stay in the hot path.
+    """
+
+    def __init__(self, enabled=True, window=2048):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.started = None
+        self.last_frame = None
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats(name, self.window))
+        return _Stage(stats)
+
+    def frame_done(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        self.last_frame = now
+        self.frames += 1
+
+    def fps(self):
+        if self.frames < 2 or self.last_frame == self.started:
+            return 0.0
+        return (self.frames - 1) / (self.last_frame - self.started)
+
+    def summary(self):
+        with self._lock:
+            stages = list(self.stages.values())
+        return {
+            "frames": self.frames,
+            "fps": round(self.fps(), 2),
+            "stages": {s.name: s.summary() for s in stages},
+        }
+
+    def format_summary(self):
+        summary = self.summary()
+        lines = [f"Frames: {summary['frames']}, {summary['fps']} FPS"]
+        for name, s in summary["stages"].items():
+            lines.append(
+                f"  {name:<12} n={s['count']:<6} p50={s['p50_ms']:.2f} ms  "
+                f"p95={s['p95_ms']:.2f} ms  p99={s['p99_ms']:.2f} ms  max={s['max_ms']:.2f} ms"
+            )
+        return "\n".join(lines)
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self, prefix="proctor"):
+        """Prometheus text exposition format (summary-style quantiles)."""
+        summary = self.summary()
+        lines = [
+            f"# TYPE {prefix}_frames_total counter",
+            f"{prefix}_frames_total {summary['frames']}",
+            f"# TYPE {prefix}_fps gauge",
+            f"{prefix}_fps {summary['fps']}",
+            f"# TYPE {prefix}_stage_latency_seconds summary",
+        ]
+        for name, s in summary["stages"].items():
+            for p in PERCENTILES:
+                lines.append(
+                    f'{prefix}_stage_latency_seconds{{stage="{name}",quantile="{p / 100}"}} '
+                    f"{s[f'p{p}_ms'] / 1000:.6f}"
+                )
+            lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{name}"}} {s["count"]}')
+            lines.append(
+                f'{prefix}_stage_latency_seconds_sum{{stage="{name}"}} '
+                f"{s['mean_ms'] * s['count'] / 1000:.6f}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+class ProfileExporter:
+    """
+    Periodically writes a profiler snapshot to a file from a background
+    thread. Files ending in .prom get Prometheus text format (for the node
+    exporter textfile collector), anything else gets JSON. Writes go through
+    a temp file and os.replace, so readers never see a partial snapshot.
+    """
+
+    def __init__(self, profiler, path, interval=10.0):
+        self.profiler = profiler
+        self.path = path
+        self.interval = interval
+        self.prometheus = path.endswith(".prom")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-exporter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def write(self):
+        text = self.profiler.to_prometheus() if self.prometheus else self.profiler.to_json()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        # Final snapshot with the complete run
+        self._write_logged()
+
+    def _write_logged(self):
+        try:
+            self.write()
+        except OSError as e:
+            print(f"WARNING: Could not write profile to {self.path}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write_logged()
@@ -1,12 +1,14 @@
 from detectors.head_pose_detector import is_head_straight
+from detectors.landmarks import has_landmarks
+from config.proctor_config import DEFAULT_CONFIG
 
-def is_face_aligned(face_landmarks):
+def is_face_aligned(face_landmarks, frame_shape=None, config=DEFAULT_CONFIG):
     """
     Returns True if the face is properly aligned (frontal, not tilted)
     for proctoring purposes.
     """
-    if not face_landmarks:
+    if not has_landmarks(face_landmarks):
         return False
 
     # Use head_pose_detector
-    return is_head_straight(face_landmarks)
+    return is_head_straight(face_landmarks, frame_shape, config)
@@ -1,8 +1,18 @@
-from config.settings import FACE_MIN_AREA_RATIO, FACE_MAX_AREA_RATIO
+from config.proctor_config import DEFAULT_CONFIG
 
-def is_face_distance_valid(face, frame_shape):
+def face_area_ratio(face, frame_shape):
     x, y, w, h = face
     frame_area = frame_shape[0] * frame_shape[1]
     face_area = w * h
-    ratio = face_area / frame_area
-    return FACE_MIN_AREA_RATIO <= ratio <= FACE_MAX_AREA_RATIO
+    return face_area / frame_area
+
+def area_ratio_in_range(ratio, config=DEFAULT_CONFIG, margin=0.0):
+    """
+    True if the ratio is within the allowed range. A `margin` (fraction of
+    the range) narrows it from both ends; a negative one widens it.
+    """
+    inset = (config.face_max_area_ratio - config.face_min_area_ratio) * margin / 2
+    return config.face_min_area_ratio + inset <= ratio <= config.face_max_area_ratio - inset
+
+def is_face_distance_valid(face, frame_shape, config=DEFAULT_CONFIG):
+    return area_ratio_in_range(face_area_ratio(face, frame_shape), config)
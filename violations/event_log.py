@@ -0,0 +1,184 @@
+"""
+Append-only violation event log.
+
+Events are written as one JSON object per line by a background thread,
+so registering a violation never waits on disk. Lines are flushed every
+batch and fsync'd at most every `fsync_interval` seconds (and on close).
+
+Each record carries the session id, a per-session sequence number, the
+session timestamp and the event type:
+
+    {"session": "...", "seq": 0, "t": 1712.5, "event": "session_start"}
+    {"session": "...", "seq": 1, "t": 1715.0, "event": "violation",
+     "type": "NO_FACE", "message": "No face detected", "attempt": 1}
+    {"session": "...", "seq": 9, "t": 2012.5, "event": "session_end",
+     "reason": "time_limit", "total_violations": 4}
+
+iter_events() and iter_sessions() read logs lazily, line by line.
+"""
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from violations.violation_types import ViolationType
+
+SESSION_START = "session_start"
+VIOLATION = "violation"
+SESSION_END = "session_end"
+
+def violation_code(violation):
+    """Stable type code (e.g. NO_FACE) for a ViolationType or its message."""
+    try:
+        return ViolationType.parse(violation).code
+    except ValueError:
+        return "UNKNOWN"
+
+
+class EventLogWriter:
+    """
+    Background writer for the event log. emit() only enqueues; a daemon
+    thread appends batches to the file. Safe to share between sessions
+    and threads. If a write fails the error is reported once, `failed` is
+    set and later events are dropped instead of queueing up in memory.
+    """
+
+    def __init__(self, path, fsync_interval=1.0, batch_size=256):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.events_written = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self.failed = False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def emit(self, record):
+        if self._closed or self.failed:
+            return
+        self._queue.put(record)
+
+    def close(self):
+        """Write everything still queued, fsync and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        try:
+            self._write_batches()
+        except (OSError, TypeError, ValueError) as e:
+            self.failed = True
+            print(f"WARNING: Event log {self.path} stopped after {self.events_written} events: {e}")
+        finally:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+
+    def _write_batches(self):
+        last_sync = time.monotonic()
+        pending_sync = False
+        running = True
+
+        while running:
+            # Block for the first event, then take whatever else is queued
+            timeout = self.fsync_interval if pending_sync else None
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+                batch = [record for record in batch if record is not None]
+
+            if batch:
+                self._file.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in batch))
+                self._file.flush()
+                self.events_written += len(batch)
+                pending_sync = True
+
+            now = time.monotonic()
+            if pending_sync and (not running or now - last_sync >= self.fsync_interval):
+                os.fsync(self._file.fileno())
+                last_sync = now
+                pending_sync = False
+
+
+class SessionEventLog:
+    """Stamps events from one session with its id and sequence numbers."""
+
+    def __init__(self, writer, session_id):
+        self.writer = writer
+        self.session_id = session_id
+        self.seq = 0
+
+    def emit(self, event, timestamp, **fields):
+        record = {"session": self.session_id, "seq": self.seq, "t": round(timestamp, 3), "event": event}
+        record.update(fields)
+        self.seq += 1
+        self.writer.emit(record)
+
+    def violation(self, violation, timestamp, attempt, **fields):
+        self.emit(VIOLATION, timestamp, type=violation_code(violation),
+                  message=violation, attempt=attempt, **fields)
+
+
+def _expand(paths):
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "*.jsonl")))
+        else:
+            yield from sorted(glob.glob(path)) or [path]
+
+
+def iter_events(paths):
+    """
+    Yield event dicts from one or more log files (or directories of
+    *.jsonl), one line at a time. A torn last line left by a crash is
+    skipped.
+    """
+    for path in _expand(paths):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def iter_sessions(paths):
+    """
+    Yield (session_id, [events]) per session. Sessions may interleave in a
+    file (as they do with the server); only sessions that are still open
+    are held in memory. Sessions without a session_end (e.g. after a
+    crash) are yielded at the end of the input.
+    """
+    open_sessions = {}
+    for event in iter_events(paths):
+        session_id = event.get("session")
+        open_sessions.setdefault(session_id, []).append(event)
+        if event.get("event") == SESSION_END:
+            yield session_id, open_sessions.pop(session_id)
+
+    for session_id, events in open_sessions.items():
+        yield session_id, events
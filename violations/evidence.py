@@ -0,0 +1,130 @@
+import os
+import queue
+import threading
+from collections import deque
+import cv2
+from violations import violation_types as vt
+from violations.event_log import violation_code
+
+# Violations that get visual evidence
+EVIDENCE_VIOLATIONS = {
+    vt.NO_FACE,
+    vt.MULTIPLE_FACES,
+    vt.FACE_DISTANCE,
+    vt.HEAD_MOVEMENT,
+}
+
+
+class FrameHistory:
+    """Recent (timestamp, frame) pairs, bounded by total bytes rather than count."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.frames = deque()
+        self.nbytes = 0
+
+    def push(self, timestamp, frame):
+        self.frames.append((timestamp, frame))
+        self.nbytes += frame.nbytes
+        while self.nbytes > self.max_bytes and len(self.frames) > 1:
+            _, old = self.frames.popleft()
+            self.nbytes -= old.nbytes
+
+    def between(self, start, end):
+        return [(t, f) for t, f in self.frames if start <= t <= end]
+
+
+class EvidenceRecorder:
+    """
+    Keeps a byte-bounded history of downscaled frames and, when a violation
+    is registered, saves JPEG keyframes from `pre_seconds` before to
+    `post_seconds` after it.
+
+    The loop only pays for one small resize per sampled frame. Frames in the
+    history are never modified, so a finished capture hands them to the
+    encoder thread as they are. If the encoder falls behind, captures are
+    dropped rather than blocking the caller.
+    """
+
+    def __init__(self, out_dir, max_bytes=32 * 1024 * 1024, pre_seconds=3.0, post_seconds=2.0,
+                 sample_fps=5, max_width=640, jpeg_quality=80, max_pending=8):
+        self.out_dir = out_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.sample_interval = 1.0 / sample_fps
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.history = FrameHistory(max_bytes)
+
+        self._last_sample = None
+        self._waiting = []  # (directory, event_time) still collecting post-event frames
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="evidence-encoder", daemon=True)
+        self._thread.start()
+
+        self.captures_saved = 0
+        self.captures_dropped = 0
+
+    def add_frame(self, frame, timestamp):
+        """Sample a frame into the history (call once per frame, before session.update)."""
+        if self._last_sample is None or timestamp - self._last_sample >= self.sample_interval:
+            self._last_sample = timestamp
+            self.history.push(timestamp, self._shrink(frame))
+
+        # Captures whose post-event window has passed are ready to encode
+        while self._waiting and timestamp >= self._waiting[0][1] + self.post_seconds:
+            self._submit(*self._waiting.pop(0))
+
+    def capture(self, violation, timestamp, attempt):
+        """
+        Schedule evidence for a violation. Returns the directory the
+        keyframes will be written to, or None if this type gets no evidence.
+        """
+        if violation not in EVIDENCE_VIOLATIONS:
+            return None
+        directory = os.path.join(self.out_dir, f"{attempt:03d}_{violation_code(violation)}")
+        self._waiting.append((directory, timestamp))
+        return directory
+
+    def close(self):
+        """Save captures still waiting for post-event frames and finish encoding."""
+        for directory, event_time in self._waiting:
+            self._submit(directory, event_time)
+        self._waiting = []
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _shrink(self, frame):
+        h, w = frame.shape[:2]
+        if not self.max_width or w <= self.max_width:
+            return frame.copy()
+        size = (self.max_width, max(1, round(h * self.max_width / w)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _submit(self, directory, event_time):
+        frames = self.history.between(event_time - self.pre_seconds, event_time + self.post_seconds)
+        try:
+            self._jobs.put_nowait((directory, event_time, frames))
+        except queue.Full:
+            self.captures_dropped += 1
+            print(f"WARNING: Evidence encoder busy, dropped {directory}")
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            directory, event_time, frames = job
+            try:
+                os.makedirs(directory, exist_ok=True)
+                for i, (t, frame) in enumerate(frames):
+                    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                    if not ok:
+                        continue
+                    # Offset from the violation in ms, e.g. 02_-1400ms.jpg
+                    name = f"{i:02d}_{round((t - event_time) * 1000):+d}ms.jpg"
+                    with open(os.path.join(directory, name), "wb") as f:
+                        f.write(jpeg.tobytes())
+                self.captures_saved += 1
+            except OSError as e:
+                print(f"WARNING: Could not save evidence to {directory}: {e}")
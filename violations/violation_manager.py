@@ -1,29 +1,152 @@
 import time
-from config.settings import MAX_VIOLATIONS
+from collections import Counter, deque, namedtuple
+from violations.violation_types import ViolationType
+from config.proctor_config import DEFAULT_CONFIG
+from config.settings import VIOLATION_DISPLAY_SECONDS, VIOLATION_HISTORY_SECONDS, VIOLATION_RECORDS_KEPT
+
+ViolationRecord = namedtuple("ViolationRecord", ["type", "timestamp", "attempt"])
+
+# Most violations shown on screen at once
+MAX_ACTIVE = 10
+
 
 class ViolationManager:
-    def __init__(self):
+    """
+    Violation registry for one session.
+
+    Memory stays constant however long the test runs: per-type counters,
+    the last `records_kept` records (the event log keeps everything), the
+    timestamps of the last `history_seconds` per type for rolling-window
+    queries, and a short list of violations still on screen. Registering
+    a violation and reading the on-screen list are O(1) amortized.
+    """
+
+    def __init__(self, clock=time.time, verbose=True, event_log=None, evidence=None,
+                 max_violations=DEFAULT_CONFIG.max_violations,
+                 type_limits=DEFAULT_CONFIG.max_violations_per_type,
+                 display_seconds=VIOLATION_DISPLAY_SECONDS,
+                 history_seconds=VIOLATION_HISTORY_SECONDS,
+                 records_kept=VIOLATION_RECORDS_KEPT):
+        """
+        Args:
+            max_violations: Most violations allowed in total
+            type_limits: Most violations allowed per type, as a mapping or
+                         (code, limit) pairs, e.g. {"EYE_MOVEMENT": 10}
+        """
         self.attempts = 0
-        self.records = []
-        self.active_violations = []  # List of (violation_text, timestamp) tuples
-        self.violation_display_duration = 3  # seconds
+        self.counts = Counter()
+        self.records = deque(maxlen=records_kept)
+        self.violation_display_duration = display_seconds
+        self.history_seconds = history_seconds
+        self.clock = clock
+        self.verbose = verbose
+        self.event_log = event_log  # Optional SessionEventLog
+        self.evidence = evidence    # Optional EvidenceRecorder
+        self.set_limits(max_violations, type_limits)
+
+        self._recent = {violation: deque() for violation in ViolationType}
+        self._active = deque(maxlen=MAX_ACTIVE)
+        self._active_types = []
+
+    def set_limits(self, max_violations, type_limits=()):
+        self.max_violations = max_violations
+        self.type_limits = {ViolationType.parse(code): limit for code, limit in dict(type_limits).items()}
 
     def register(self, violation):
+        """
+        Count a violation. Returns False once the total or the type's own
+        limit has been exceeded.
+        """
+        violation = ViolationType.parse(violation)
+        now = self.clock()
         self.attempts += 1
-        self.records.append(violation)
+        self.counts[violation] += 1
+        self.records.append(ViolationRecord(violation, now, self.attempts))
+
+        recent = self._recent[violation]
+        recent.append(now)
+        _expire(recent, now - self.history_seconds)
+
         # Add violation with current timestamp for display
-        self.active_violations.append((violation, time.time()))
-        print(f"[VIOLATION {self.attempts}] {violation}")
+        self._active.append((violation, now))
+        self._active_types = [v for v, _ in self._active]
 
-        return self.attempts <= MAX_VIOLATIONS
+        if self.verbose:
+            print(f"[VIOLATION {self.attempts}] {violation}")
+        evidence_dir = None
+        if self.evidence is not None:
+            evidence_dir = self.evidence.capture(violation, now, self.attempts)
+        if self.event_log is not None:
+            extra = {"evidence": evidence_dir} if evidence_dir else {}
+            self.event_log.violation(violation, now, self.attempts, **extra)
+
+        return self.within_limits(violation)
+
+    def within_limits(self, violation=None):
+        """True while the total (and the type's count, if given) is within its limit."""
+        if self.attempts > self.max_violations:
+            return False
+        if violation is None:
+            return True
+        violation = ViolationType.parse(violation)
+        limit = self.type_limits.get(violation)
+        return limit is None or self.counts[violation] <= limit
 
     def get_active_violations(self):
-        """Get list of violations that are still active (within 3 seconds)"""
-        current_time = time.time()
-        # Filter out expired violations
-        self.active_violations = [
-            (v, ts) for v, ts in self.active_violations
-            if current_time - ts < self.violation_display_duration
-        ]
-        # Return just the violation text in reverse order (newest at bottom)
-        return [v for v, ts in self.active_violations]
+        """Get list of violations that are still active (within the display duration)"""
+        current_time = self.clock()
+        # Only the oldest entries can have expired
+        expired = False
+        while self._active and current_time - self._active[0][1] >= self.violation_display_duration:
+            self._active.popleft()
+            expired = True
+        if expired:
+            self._active_types = [v for v, _ in self._active]
+        # Oldest first (newest at bottom)
+        return self._active_types
+
+    def count(self, violation_type=None):
+        """Violations registered so far, in total or of one type."""
+        if violation_type is None:
+            return self.attempts
+        return self.counts[ViolationType.parse(violation_type)]
+
+    def count_in_window(self, seconds, violation_type=None):
+        """
+        Violations (in total or of one type) in the last `seconds`, which
+        may be at most `history_seconds`.
+        """
+        if seconds > self.history_seconds:
+            raise ValueError(f"Window of {seconds}s is longer than the {self.history_seconds}s of history kept")
+        now = self.clock()
+        cutoff = now - seconds
+        types = self._recent if violation_type is None else [ViolationType.parse(violation_type)]
+
+        total = 0
+        for violation in types:
+            recent = self._recent[violation]
+            _expire(recent, now - self.history_seconds)
+            # Newest at the right; stop at the first one outside the window
+            for timestamp in reversed(recent):
+                if timestamp <= cutoff:
+                    break
+                total += 1
+        return total
+
+    def last(self, violation_type=None):
+        """Most recent ViolationRecord (of one type, if given) still kept, or None."""
+        if violation_type is not None:
+            violation_type = ViolationType.parse(violation_type)
+        for record in reversed(self.records):
+            if violation_type is None or record.type == violation_type:
+                return record
+        return None
+
+    def summary(self):
+        """{type code: count} for every type registered so far."""
+        return {violation.code: count for violation, count in self.counts.items()}
+
+
+def _expire(timestamps, cutoff):
+    while timestamps and timestamps[0] <= cutoff:
+        timestamps.popleft()
@@ -1,8 +1,43 @@
+from enum import Enum
+
+
+class ViolationType(str, Enum):
+    """
+    Violation types. Members compare equal to (and serialize as) their
+    message, so they can be printed, drawn and written to JSON directly;
+    the member name is the stable type code used in logs.
+    """
+    NO_FACE = "No face detected"
+    MULTIPLE_FACES = "Multiple faces detected"
+    HEAD_MOVEMENT = "Face moved away from screen"
+    EYE_MOVEMENT = "Suspicious eye movement"
+    MOBILE_PHONE = "Mobile phone detected"
+    FACE_DISTANCE = "Face too close or too far"
+
+    def __str__(self):
+        return self.value
+
+    @property
+    def code(self):
+        return self.name
+
+    @classmethod
+    def parse(cls, value):
+        """Member from a member, a message or a type code; raises ValueError."""
+        if isinstance(value, cls):
+            return value
+        if value in cls.__members__:
+            return cls[value]
+        return cls(value)
+
+
 # Violation type constants
-NO_FACE = "No face detected"
-MULTIPLE_FACES = "Multiple faces detected"
-HEAD_MOVEMENT = "Face moved away from screen"
-EYE_MOVEMENT = "Suspicious eye movement"
-MOBILE_PHONE = "Mobile phone detected"
-PHONE_DETECTED = "Mobile phone detected"
-FACE_DISTANCE = "Face too close or too far"
+NO_FACE = ViolationType.NO_FACE
+MULTIPLE_FACES = ViolationType.MULTIPLE_FACES
+HEAD_MOVEMENT = ViolationType.HEAD_MOVEMENT
+EYE_MOVEMENT = ViolationType.EYE_MOVEMENT
+MOBILE_PHONE = ViolationType.MOBILE_PHONE
+FACE_DISTANCE = ViolationType.FACE_DISTANCE
+
+# Deprecated: same type as MOBILE_PHONE, kept for existing imports
+PHONE_DETECTED = MOBILE_PHONE